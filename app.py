@@ -1,10 +1,12 @@
 """Main Flask application entry point."""
 
-import os
 from datetime import timedelta
 from flask import Flask
-from config import config
+from config import config, get_env
 from models import init_database
+from utils.json_provider import OrjsonProvider, orjson
+from utils.profiling import init_profiling
+from utils.server_timing import init_server_timing
 
 
 def create_app(config_name=None):
@@ -19,22 +21,39 @@ def create_app(config_name=None):
     """
     app = Flask(__name__)
 
-    # Load configuration
+    # Load configuration (.env is read here, not at import)
     if config_name is None:
-        config_name = os.getenv('FLASK_ENV', 'development')
+        config_name = get_env()['FLASK_ENV']
 
+    config[config_name].init_app(app)
     app.config.from_object(config[config_name])
 
+    # Use orjson for JSON responses when it is installed
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+
     # Session configuration for security
     app.config['SESSION_COOKIE_HTTPONLY'] = True  # Prevent JavaScript access
     app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'  # CSRF protection
     app.config['SESSION_COOKIE_SECURE'] = config_name == 'production'  # HTTPS only in production
     app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=7)  # Session timeout
 
-    # Initialize database
+    # Report timings recorded with utils.server_timing.timed
+    init_server_timing(app)
+
+    # Sample request profiles when PROFILE=1
+    if app.config['PROFILE']:
+        init_profiling(app, app.config['PROFILE_SAMPLE_RATE'], app.config['PROFILE_DIR'])
+
+    # Initialize database (skipped if it is already up to date with schema.sql)
     with app.app_context():
         init_database()
 
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Run the database schema script."""
+        init_database(force=True)
+
     # Register blueprints
     from routes.auth import auth_bp
     from routes.public import public_bp
@@ -43,6 +62,20 @@ def create_app(config_name=None):
     app.register_blueprint(public_bp)
     app.register_blueprint(admin_bp)
 
+    # Background threads are started on the first request rather than here,
+    # so CLI commands don't start them and each forked worker (e.g. gunicorn
+    # --preload) runs its own. Both calls are no-ops once started.
+    from services.cache_service import cache
+    from routes.public import start_cache_warmer
+
+    @app.before_request
+    def ensure_background_threads():
+        # Sweep expired cache entries
+        cache.start_cleanup()
+        # Keep public dashboard responses cached so visitors never hit a cold cache
+        if app.config['CACHE_WARMING']:
+            start_cache_warmer(app)
+
     # Basic health check route
     @app.route('/health')
     def health():
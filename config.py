@@ -1,37 +1,103 @@
 import os
+from functools import lru_cache
+from types import MappingProxyType
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+# Environment variables used by the app, with their defaults
+ENV_DEFAULTS = {
+    'SECRET_KEY': 'dev-secret-key-change-in-production',
+    'FLASK_ENV': 'development',
+    'APP_PASSWORD': 'changeme',
+    'DATABASE_PATH': 'instance/tracker.db',
+    'CACHE_DURATION': '3600',  # 1 hour default
+    'CACHE_MAXSIZE': '1024',  # Max in-memory cache entries (LRU eviction)
+    'CACHE_WARMING': '0',  # 1: keep public dashboard responses pre-built
+    'REDIS_URL': '',  # Empty: use the in-memory cache
+    'PROFILE': '0',  # 1: profile a sample of requests
+    'PROFILE_SAMPLE_RATE': '1000',  # Profile 1 in N requests
+    'PROFILE_DIR': 'instance/profiles',
+}
+
+
+@lru_cache(maxsize=1)
+def get_env():
+    """
+    Load the .env file once and snapshot the app's environment variables.
+
+    Called lazily (on first config access) rather than at import, so
+    importing this module does no file I/O.
+
+    Returns:
+        Read-only mapping of variable name to value (defaults applied)
+    """
+    load_dotenv()
+    return MappingProxyType({
+        key: os.getenv(key, default) for key, default in ENV_DEFAULTS.items()
+    })
+
+
+# Marks an EnvSetting that hasn't been read yet
+_UNSET = object()
+
+
+class EnvSetting:
+    """Config class attribute read from the environment on first access."""
+
+    def __init__(self, key, convert=str):
+        """
+        Declare a setting backed by an environment variable.
+
+        Args:
+            key: Environment variable name (must be in ENV_DEFAULTS)
+            convert: Function applied to the raw string value
+        """
+        self.key = key
+        self.convert = convert
+        self._value = _UNSET
+
+    def __get__(self, obj, owner=None):
+        # The environment snapshot never changes, so convert it only once
+        # (settings like APP_PASSWORD and CACHE_DURATION are read per request)
+        if self._value is _UNSET:
+            self._value = self.convert(get_env()[self.key])
+        return self._value
 
 
 class Config:
     """Application configuration class."""
 
     # Flask Configuration
-    SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
-    FLASK_ENV = os.getenv('FLASK_ENV', 'development')
+    SECRET_KEY = EnvSetting('SECRET_KEY')
+    FLASK_ENV = EnvSetting('FLASK_ENV')
 
     # Authentication
-    APP_PASSWORD = os.getenv('APP_PASSWORD', 'changeme')
+    APP_PASSWORD = EnvSetting('APP_PASSWORD')
 
     # Database Configuration
-    DATABASE_PATH = os.getenv('DATABASE_PATH', 'instance/tracker.db')
+    DATABASE_PATH = EnvSetting('DATABASE_PATH')
 
     # Cache Configuration
-    CACHE_DURATION = int(os.getenv('CACHE_DURATION', 3600))  # 1 hour default
+    CACHE_DURATION = EnvSetting('CACHE_DURATION', int)
+    CACHE_MAXSIZE = EnvSetting('CACHE_MAXSIZE', int)
+    CACHE_WARMING = EnvSetting('CACHE_WARMING', lambda value: value == '1')
+    REDIS_URL = EnvSetting('REDIS_URL')  # Shared cache for multi-worker deployments
+
+    # Profiling Configuration
+    PROFILE = EnvSetting('PROFILE', lambda value: value == '1')
+    PROFILE_SAMPLE_RATE = EnvSetting('PROFILE_SAMPLE_RATE', int)
+    PROFILE_DIR = EnvSetting('PROFILE_DIR')
 
     # Session Configuration
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Lax'
 
     # In production, set this to True
-    SESSION_COOKIE_SECURE = FLASK_ENV == 'production'
+    SESSION_COOKIE_SECURE = EnvSetting('FLASK_ENV', lambda env: env == 'production')
 
     @staticmethod
     def init_app(app):
         """Initialize application with config."""
-        pass
+        get_env()
 
 
 class DevelopmentConfig(Config):
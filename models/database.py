@@ -1,47 +1,218 @@
 import sqlite3
 import os
+import atexit
+import queue
+import threading
+import zlib
+from pathlib import Path
 from contextlib import contextmanager
 from config import Config
 
 
+# Per-connection tuning applied to every new connection.
+# synchronous=NORMAL is safe under WAL and saves an fsync per commit.
+CONNECTION_PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+)
+
+# Maximum number of idle connections kept open per database
+POOL_SIZE = 5
+
+# Prepared statements cached per connection (sqlite3 default is 128)
+STATEMENT_CACHE_SIZE = 256
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'schema.sql')
+
+
+def read_schema():
+    """
+    Read schema.sql and its fingerprint.
+
+    Returns:
+        Tuple of (schema SQL, fingerprint), where the fingerprint is a
+        CRC32 of the script that fits in PRAGMA user_version (signed 32-bit)
+    """
+    with open(SCHEMA_PATH, 'r') as f:
+        schema_sql = f.read()
+    return schema_sql, zlib.crc32(schema_sql.encode()) & 0x7FFFFFFF
+
+
 class Database:
     """Database connection and initialization handler."""
 
+    # Database files already switched to WAL in this process
+    # (journal_mode is persistent, so it only needs setting once per file)
+    _wal_enabled_paths = set()
+
     def __init__(self, db_path=None):
         """Initialize database handler with path."""
-        self.db_path = db_path or Config.DATABASE_PATH
+        self._db_path = db_path
+        self._pools = self._new_pools()
+        self._pool_pid = os.getpid()
+        self._dir_ready = False
+        self._local = threading.local()  # Open transaction() connection, per thread
+        atexit.register(self.close_all)
+
+    @property
+    def db_path(self):
+        """Database file path (defaults to Config.DATABASE_PATH, read lazily)."""
+        return self._db_path or Config.DATABASE_PATH
 
     def _ensure_instance_dir(self):
-        """Ensure the instance directory exists."""
+        """Ensure the instance directory exists (checked once per handler)."""
+        if self._dir_ready:
+            return
+
         db_dir = os.path.dirname(self.db_path)
-        if db_dir and not os.path.exists(db_dir):
-            os.makedirs(db_dir, mode=0o755)
+        if db_dir:
+            os.makedirs(db_dir, mode=0o755, exist_ok=True)
+        self._dir_ready = True
+
+    @staticmethod
+    def _new_pools():
+        """Create empty connection pools, keyed by read-only flag."""
+        return {
+            False: queue.LifoQueue(maxsize=POOL_SIZE),
+            True: queue.LifoQueue(maxsize=POOL_SIZE)
+        }
+
+    def _connect(self, readonly=False):
+        """Open and configure a new SQLite connection."""
+        self._ensure_instance_dir()
+        if readonly:
+            # mode=ro never takes write locks, so readers can't contend with writers
+            target = Path(self.db_path).absolute().as_uri() + '?mode=ro'
+        else:
+            target = self.db_path
+
+        # Autocommit mode with explicit BEGIN so transactions are controlled here
+        conn = sqlite3.connect(
+            target,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            uri=readonly
+        )
+        conn.row_factory = sqlite3.Row  # Enable column access by name
+
+        if not readonly and self.db_path not in Database._wal_enabled_paths:
+            # Readers no longer block writers (and vice versa)
+            conn.execute("PRAGMA journal_mode = WAL")
+            Database._wal_enabled_paths.add(self.db_path)
+
+        # Foreign keys, busy timeout, and cache/sync tuning
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+
+        return conn
+
+    def _checkout(self, readonly=False):
+        """Take an idle connection from the pool, or open a new one."""
+        # Connections must not be shared across forked worker processes
+        if self._pool_pid != os.getpid():
+            self._pools = self._new_pools()
+            self._pool_pid = os.getpid()
+
+        try:
+            return self._pools[readonly].get_nowait()
+        except queue.Empty:
+            return self._connect(readonly)
+
+    def _checkin(self, conn, readonly=False):
+        """Return a connection to the pool, closing it if the pool is full."""
+        try:
+            self._pools[readonly].put_nowait(conn)
+        except queue.Full:
+            self._close(conn)
+
+    def _close(self, conn):
+        """Refresh planner statistics and close a connection."""
+        try:
+            conn.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            pass
+        conn.close()
+
+    def close_all(self):
+        """Close all idle pooled connections."""
+        for pool in self._pools.values():
+            while True:
+                try:
+                    conn = pool.get_nowait()
+                except queue.Empty:
+                    break
+                self._close(conn)
+
+    def optimize(self):
+        """Run PRAGMA optimize with a bounded analysis cost."""
+        with self.get_connection() as conn:
+            conn.commit()  # PRAGMA optimize may run ANALYZE outside a transaction
+            conn.execute("PRAGMA analysis_limit = 1000")
+            conn.execute("PRAGMA optimize")
 
     @contextmanager
-    def get_connection(self):
+    def get_connection(self, readonly=False):
         """
-        Context manager for database connections.
+        Context manager for pooled database connections.
+
+        Args:
+            readonly: If True, use a read-only connection (mode=ro)
 
         Usage:
             with db.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute(...)
         """
-        self._ensure_instance_dir()
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Enable column access by name
+        # Inside transaction(): join it (reads included, so they see its writes)
+        current = getattr(self._local, 'conn', None)
+        if current is not None:
+            yield current
+            return
 
-        # Enable foreign key constraints
-        conn.execute("PRAGMA foreign_keys = ON")
+        conn = self._checkout(readonly)
 
         try:
+            conn.execute("BEGIN")
             yield conn
             conn.commit()
         except Exception:
             conn.rollback()
             raise
         finally:
-            conn.close()
+            if conn.in_transaction:
+                # Abandoned mid-transaction; never hand back an open transaction
+                conn.rollback()
+            self._checkin(conn, readonly)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run several service calls as one write transaction on this thread.
+
+        Every get_connection() (and so every execute_* call) made inside
+        the block reuses the same connection, so the block commits once.
+        Nested transaction() blocks join the outer one.
+
+        Usage:
+            with db.transaction():
+                create_habit(...)
+                upsert_log(...)
+        """
+        if getattr(self._local, 'conn', None) is not None:
+            yield self._local.conn
+            return
+
+        with self.get_connection() as conn:
+            self._local.conn = conn
+            try:
+                yield conn
+            finally:
+                self._local.conn = None
 
     def init_db(self):
         """
@@ -50,47 +221,91 @@ class Database:
         """
         self._ensure_instance_dir()
 
-        # Read schema file
-        schema_path = os.path.join(os.path.dirname(__file__), 'schema.sql')
-
-        with open(schema_path, 'r') as f:
-            schema_sql = f.read()
+        schema_sql, fingerprint = read_schema()
 
-        # Execute schema
+        # Execute schema, then record which schema.sql it came from
         with self.get_connection() as conn:
             conn.executescript(schema_sql)
+            conn.execute("PRAGMA user_version = " + str(fingerprint))
+
+        self.optimize()
 
         print(f"Database initialized at: {self.db_path}")
 
-    def execute_query(self, query, params=None):
+    def schema_is_current(self):
+        """
+        Check whether the database was initialized from the current schema.sql.
+
+        Compares the schema fingerprint stored in PRAGMA user_version by
+        init_db with the current file's. (File mtimes can't be used: WAL
+        checkpoints update the database file's mtime.)
+
+        Returns:
+            True if the database exists and was initialized from the
+            current schema.sql
+        """
+        try:
+            if os.path.getsize(self.db_path) == 0:
+                return False
+        except OSError:
+            return False
+
+        with self.get_connection(readonly=True) as conn:
+            stored = conn.execute("PRAGMA user_version").fetchone()[0]
+        return stored == read_schema()[1]
+
+    def execute_query(self, query, params=None, as_tuples=False):
         """
         Execute a SELECT query and return results.
 
         Args:
             query: SQL query string
             params: Query parameters (tuple or dict)
+            as_tuples: If True, return plain tuples in SELECT column order
+                       (cheaper than name lookups on hot paths)
 
         Returns:
-            List of sqlite3.Row objects
+            List of sqlite3.Row objects (or tuples if as_tuples is True)
         """
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.cursor()
+            if as_tuples:
+                cursor.row_factory = None
             if params:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
             return cursor.fetchall()
 
+    def execute_insert(self, query, params=None):
+        """
+        Execute an INSERT query.
+
+        Args:
+            query: SQL query string
+            params: Query parameters (tuple or dict)
+
+        Returns:
+            ID of the inserted row
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            return cursor.lastrowid
+
     def execute_update(self, query, params=None):
         """
-        Execute an INSERT, UPDATE, or DELETE query.
+        Execute an UPDATE or DELETE query.
 
         Args:
             query: SQL query string
             params: Query parameters (tuple or dict)
 
         Returns:
-            ID of last inserted row (for INSERT) or number of affected rows
+            Number of affected rows
         """
         with self.get_connection() as conn:
             cursor = conn.cursor()
@@ -98,10 +313,25 @@ class Database:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
+            # Not lastrowid: it is per-connection and would leak from an
+            # earlier INSERT on the same pooled connection
+            return cursor.rowcount
+
+    def execute_many(self, query, seq_of_params):
+        """
+        Execute an INSERT, UPDATE, or DELETE query for each parameter set
+        in a single transaction.
 
-            # Return lastrowid for INSERT, rowcount for UPDATE/DELETE
-            if cursor.lastrowid > 0:
-                return cursor.lastrowid
+        Args:
+            query: SQL query string
+            seq_of_params: Sequence of query parameter tuples
+
+        Returns:
+            Number of affected rows
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(query, seq_of_params)
             return cursor.rowcount
 
 
@@ -109,9 +339,18 @@ class Database:
 db = Database()
 
 
-def init_database():
-    """Initialize the database. Called when app starts."""
-    db.init_db()
+def init_database(force=False):
+    """
+    Initialize the database. Called when app starts.
+
+    Skipped when the database was already initialized from the current
+    schema.sql, so worker restarts don't re-run the schema script.
+
+    Args:
+        force: If True, always run the schema script
+    """
+    if force or not db.schema_is_current():
+        db.init_db()
 
 
 def get_db():
@@ -27,7 +27,20 @@ def create_schema_version_table(conn):
     conn.commit()
 
 
-def migration_001_add_value_tracking(conn):
+def get_schema_snapshot(conn):
+    """
+    Read the column names of the migrated tables in one pass.
+
+    Returns:
+        Dictionary mapping table name to a set of column names
+    """
+    return {
+        table: {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for table in ('habits', 'logs')
+    }
+
+
+def migration_001_add_value_tracking(conn, schema):
     """
     Migration 001: Add value tracking columns.
 
@@ -38,22 +51,20 @@ def migration_001_add_value_tracking(conn):
     """
     print("Running migration 001: Add value tracking columns...")
 
-    # Check if columns already exist
-    cursor = conn.execute("PRAGMA table_info(habits)")
-    habit_columns = {row[1] for row in cursor.fetchall()}
-
-    cursor = conn.execute("PRAGMA table_info(logs)")
-    log_columns = {row[1] for row in cursor.fetchall()}
+    habit_columns = schema['habits']
+    log_columns = schema['logs']
 
     # Add columns to habits table if they don't exist
     if 'tracks_value' not in habit_columns:
         conn.execute("ALTER TABLE habits ADD COLUMN tracks_value BOOLEAN DEFAULT 0 NOT NULL")
+        habit_columns.add('tracks_value')
         print("  ✓ Added habits.tracks_value column")
     else:
         print("  - habits.tracks_value already exists, skipping")
 
     if 'value_unit' not in habit_columns:
         conn.execute("ALTER TABLE habits ADD COLUMN value_unit TEXT")
+        habit_columns.add('value_unit')
         print("  ✓ Added habits.value_unit column")
     else:
         print("  - habits.value_unit already exists, skipping")
@@ -61,6 +72,7 @@ def migration_001_add_value_tracking(conn):
     # Add column to logs table if it doesn't exist
     if 'value' not in log_columns:
         conn.execute("ALTER TABLE logs ADD COLUMN value REAL")
+        log_columns.add('value')
         print("  ✓ Added logs.value column")
     else:
         print("  - logs.value already exists, skipping")
@@ -69,7 +81,7 @@ def migration_001_add_value_tracking(conn):
     print("Migration 001 completed successfully!")
 
 
-def migration_002_add_value_aggregation_type(conn):
+def migration_002_add_value_aggregation_type(conn, schema):
     """
     Migration 002: Add value aggregation type column.
 
@@ -78,13 +90,12 @@ def migration_002_add_value_aggregation_type(conn):
     """
     print("Running migration 002: Add value aggregation type column...")
 
-    # Check if column already exists
-    cursor = conn.execute("PRAGMA table_info(habits)")
-    habit_columns = {row[1] for row in cursor.fetchall()}
+    habit_columns = schema['habits']
 
     # Add column to habits table if it doesn't exist
     if 'value_aggregation_type' not in habit_columns:
         conn.execute("ALTER TABLE habits ADD COLUMN value_aggregation_type TEXT DEFAULT 'absolute' NOT NULL")
+        habit_columns.add('value_aggregation_type')
         print("  ✓ Added habits.value_aggregation_type column")
     else:
         print("  - habits.value_aggregation_type already exists, skipping")
@@ -93,7 +104,7 @@ def migration_002_add_value_aggregation_type(conn):
     print("Migration 002 completed successfully!")
 
 
-def migration_003_add_habit_categories(conn):
+def migration_003_add_habit_categories(conn, schema):
     """
     Migration 003: Add habit categories columns.
 
@@ -103,16 +114,13 @@ def migration_003_add_habit_categories(conn):
     """
     print("Running migration 003: Add habit categories columns...")
 
-    # Check if columns already exist
-    cursor = conn.execute("PRAGMA table_info(habits)")
-    habit_columns = {row[1] for row in cursor.fetchall()}
-
-    cursor = conn.execute("PRAGMA table_info(logs)")
-    log_columns = {row[1] for row in cursor.fetchall()}
+    habit_columns = schema['habits']
+    log_columns = schema['logs']
 
     # Add column to habits table if it doesn't exist
     if 'categories' not in habit_columns:
         conn.execute("ALTER TABLE habits ADD COLUMN categories TEXT")
+        habit_columns.add('categories')
         print("  ✓ Added habits.categories column")
     else:
         print("  - habits.categories already exists, skipping")
@@ -120,6 +128,7 @@ def migration_003_add_habit_categories(conn):
     # Add column to logs table if it doesn't exist
     if 'category' not in log_columns:
         conn.execute("ALTER TABLE logs ADD COLUMN category TEXT")
+        log_columns.add('category')
         print("  ✓ Added logs.category column")
     else:
         print("  - logs.category already exists, skipping")
@@ -128,11 +137,88 @@ def migration_003_add_habit_categories(conn):
     print("Migration 003 completed successfully!")
 
 
+def migration_004_add_completed_logs_index(conn, schema):
+    """
+    Migration 004: Add partial index of completed logs.
+
+    Adds:
+    - idx_logs_completed ON logs(habit_id, date) WHERE status = 1
+    """
+    print("Running migration 004: Add completed logs index...")
+
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_logs_completed ON logs(habit_id, date) WHERE status = 1"
+    )
+    print("  ✓ Added idx_logs_completed index")
+
+    conn.commit()
+    print("Migration 004 completed successfully!")
+
+
+def migration_005_add_habits_order_index(conn, schema):
+    """
+    Migration 005: Order public/active habit lookups by index.
+
+    Replaces:
+    - idx_habits_public ON habits(is_public, is_active)
+    with:
+    - idx_habits_public_active_order ON habits(is_public, is_active, order_index, created_at)
+    """
+    print("Running migration 005: Add ordered public/active habits index...")
+
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_habits_public_active_order "
+        "ON habits(is_public, is_active, order_index, created_at)"
+    )
+    print("  ✓ Added idx_habits_public_active_order index")
+
+    # The new index has the same leading columns, so the old one is redundant
+    conn.execute("DROP INDEX IF EXISTS idx_habits_public")
+    print("  ✓ Dropped idx_habits_public index")
+
+    conn.commit()
+    print("Migration 005 completed successfully!")
+
+
+def migration_006_add_data_version(conn, schema):
+    """
+    Migration 006: Add the shared data version.
+
+    Adds:
+    - data_version table (single row)
+    - AFTER INSERT/UPDATE/DELETE triggers on habits and logs that bump it
+    """
+    print("Running migration 006: Add data version...")
+
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS data_version ("
+        "id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)"
+    )
+    conn.execute("INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0)")
+    print("  ✓ Added data_version table")
+
+    for table in ('habits', 'logs'):
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            # Names come from the fixed tuples above, not from input
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS " + table + "_" + event.lower() + "_bump_version "
+                "AFTER " + event + " ON " + table + " "
+                "BEGIN UPDATE data_version SET version = version + 1; END"
+            )
+    print("  ✓ Added data version triggers on habits and logs")
+
+    conn.commit()
+    print("Migration 006 completed successfully!")
+
+
 # Migration registry - add new migrations here in order
 MIGRATIONS = [
     migration_001_add_value_tracking,
     migration_002_add_value_aggregation_type,
     migration_003_add_habit_categories,
+    migration_004_add_completed_logs_index,
+    migration_005_add_habits_order_index,
+    migration_006_add_data_version,
 ]
 
 
@@ -148,11 +234,14 @@ def run_migrations():
         current_version = get_current_schema_version(conn)
         print(f"Current schema version: {current_version}")
 
+        # Read table columns once; migrations update it as they add columns
+        schema = get_schema_snapshot(conn)
+
         # Run pending migrations
         for i, migration in enumerate(MIGRATIONS, start=1):
             if i > current_version:
                 print(f"\n--- Running migration {i} ---")
-                migration(conn)
+                migration(conn, schema)
 
                 # Record migration
                 conn.execute(
@@ -164,6 +253,9 @@ def run_migrations():
             else:
                 print(f"✓ Migration {i} already applied")
 
+        # Refresh query planner statistics after schema changes
+        conn.execute("PRAGMA optimize")
+
         # Get final version
         final_version = get_current_schema_version(conn)
 
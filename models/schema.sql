@@ -37,6 +37,35 @@ CREATE TABLE IF NOT EXISTS logs (
     UNIQUE(habit_id, date)
 );
 
+-- Data Version Table
+-- Single row bumped by the triggers below in the same transaction as every
+-- habit or log change. Caches and ETags are keyed on it, so all worker
+-- processes see a change as soon as it commits.
+CREATE TABLE IF NOT EXISTS data_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0);
+
+CREATE TRIGGER IF NOT EXISTS habits_insert_bump_version AFTER INSERT ON habits
+BEGIN UPDATE data_version SET version = version + 1; END;
+
+CREATE TRIGGER IF NOT EXISTS habits_update_bump_version AFTER UPDATE ON habits
+BEGIN UPDATE data_version SET version = version + 1; END;
+
+CREATE TRIGGER IF NOT EXISTS habits_delete_bump_version AFTER DELETE ON habits
+BEGIN UPDATE data_version SET version = version + 1; END;
+
+CREATE TRIGGER IF NOT EXISTS logs_insert_bump_version AFTER INSERT ON logs
+BEGIN UPDATE data_version SET version = version + 1; END;
+
+CREATE TRIGGER IF NOT EXISTS logs_update_bump_version AFTER UPDATE ON logs
+BEGIN UPDATE data_version SET version = version + 1; END;
+
+CREATE TRIGGER IF NOT EXISTS logs_delete_bump_version AFTER DELETE ON logs
+BEGIN UPDATE data_version SET version = version + 1; END;
+
 -- Indexes for Performance
 -- Index on logs.date for date-range queries
 CREATE INDEX IF NOT EXISTS idx_logs_date ON logs(date);
@@ -44,8 +73,13 @@ CREATE INDEX IF NOT EXISTS idx_logs_date ON logs(date);
 -- Composite index on logs for habit+date lookups
 CREATE INDEX IF NOT EXISTS idx_logs_habit_date ON logs(habit_id, date);
 
+-- Partial index of completed logs (streaks, heatmap, archived stats)
+-- Covers habit_id + date, so these queries never touch the table
+CREATE INDEX IF NOT EXISTS idx_logs_completed ON logs(habit_id, date) WHERE status = 1;
+
 -- Composite index on habits for filtering public/active habits
-CREATE INDEX IF NOT EXISTS idx_habits_public ON habits(is_public, is_active);
+-- Ends with the list ordering, so public dashboard habits need no sort step
+CREATE INDEX IF NOT EXISTS idx_habits_public_active_order ON habits(is_public, is_active, order_index, created_at);
 
 -- Index on habits.order_index for efficient ordering
 CREATE INDEX IF NOT EXISTS idx_habits_order ON habits(order_index);
@@ -1,7 +1,8 @@
 """Admin routes for habit tracking and management."""
 
-from datetime import datetime
-from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash
+import re
+from datetime import date as date_type, datetime
+from flask import Blueprint, render_template, request, jsonify, flash, current_app
 from utils.decorators import login_required
 from services import (
     get_admin_tracking_data,
@@ -12,12 +13,76 @@ from services import (
     update_habit,
     reorder_habits,
     delete_habit,
-    invalidate_dashboard_cache
+    get_data_version,
+    get_cached,
+    set_cached,
+    versioned_key
 )
 
 # Create admin blueprint
 admin_bp = Blueprint('admin', __name__)
 
+# Strict YYYY-MM-DD shape (date.fromisoformat alone also accepts other ISO forms)
+DATE_PATTERN = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}')
+
+
+def parse_date(date_str):
+    """
+    Parse a YYYY-MM-DD string into a date.
+
+    Args:
+        date_str: Date string to parse
+
+    Returns:
+        date object
+
+    Raises:
+        ValueError: If the string is not a valid YYYY-MM-DD date
+    """
+    if not DATE_PATTERN.fullmatch(date_str):
+        raise ValueError(f'Invalid date format: {date_str!r}')
+    return date_type.fromisoformat(date_str)
+
+
+def make_etag(*parts):
+    """
+    Build an ETag for data that only changes when the data version changes.
+
+    The data version is read from the database, so every worker process
+    builds the same ETag for the same data and a 304 from any worker
+    reflects writes made through the others.
+
+    Args:
+        *parts: Values identifying the response (endpoint, query parameters)
+
+    Returns:
+        ETag string
+    """
+    return '-'.join(str(part) for part in ('v', get_data_version()) + parts)
+
+
+def conditional_json(etag, build_data):
+    """
+    Return a 304 if the client already has this ETag, else a JSON response.
+
+    Args:
+        etag: ETag for the current data
+        build_data: Callable returning the JSON-serializable data (only
+                    called when the client's copy is stale)
+
+    Returns:
+        Flask response
+    """
+    if etag in request.if_none_match:
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(build_data())
+
+    response.set_etag(etag)
+    # Private admin data: browsers must revalidate before reuse
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
 
 @admin_bp.route('/track')
 @login_required
@@ -34,14 +99,14 @@ def track():
     if date_str:
         try:
             # Validate date format
-            date = datetime.strptime(date_str, '%Y-%m-%d').date()
+            date = parse_date(date_str)
         except ValueError:
             flash('Invalid date format. Using today instead.', 'error')
             date = datetime.now().date()
     else:
         date = datetime.now().date()
 
-    return render_template('admin/track.html', date=date.strftime('%Y-%m-%d'))
+    return render_template('admin/track.html', date=date.isoformat())
 
 
 @admin_bp.route('/api/track/data')
@@ -63,14 +128,13 @@ def track_data():
 
     try:
         # Validate date format
-        datetime.strptime(date_str, '%Y-%m-%d')
+        parse_date(date_str)
     except ValueError:
         return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
 
-    # Get tracking data
-    data = get_admin_tracking_data(date_str)
-
-    return jsonify(data)
+    # Get tracking data (skipped when the client's copy is current)
+    etag = make_etag('track', date_str)
+    return conditional_json(etag, lambda: get_admin_tracking_data(date_str))
 
 
 @admin_bp.route('/api/track/save', methods=['POST'])
@@ -103,8 +167,8 @@ def save_tracking():
 
     # Validate date format
     try:
-        datetime.strptime(date_str, '%Y-%m-%d')
-    except ValueError:
+        parse_date(date_str)
+    except (TypeError, ValueError):
         return jsonify({'error': 'Invalid date format'}), 400
 
     # Convert logs list to dict for save_day_logs
@@ -124,12 +188,9 @@ def save_tracking():
         else:
             habit_statuses[habit_id] = log['status']
 
-    # Save logs
+    # Save logs (the data_version triggers invalidate cached responses)
     count = save_day_logs(date_str, habit_statuses)
 
-    # Invalidate dashboard cache since data changed
-    invalidate_dashboard_cache()
-
     return jsonify({
         'success': True,
         'message': f'Saved {count} logs for {date_str}'
@@ -152,26 +213,41 @@ def get_habits():
     Returns:
         JSON with all habits
     """
-    habits = get_all_habits(include_private=True)
+    return conditional_json(make_etag('habits'), build_habits_data)
+
+
+def build_habits_data():
+    """Build the JSON data for the habits list (cached until data changes)."""
+    cache_key = versioned_key('admin_habits_data')
+    cached_data = get_cached(cache_key)
+    if cached_data:
+        return cached_data
+
+    # Plain tuples in HABIT_COLUMNS order (cheaper than sqlite3.Row lookups)
+    habits = get_all_habits(include_private=True, as_tuples=True)
 
     # Convert to list of dicts
     habits_list = [
         {
-            'id': h['id'],
-            'name': h['name'],
-            'is_active': bool(h['is_active']),
-            'is_public': bool(h['is_public']),
-            'order_index': h['order_index'],
-            'tracks_value': bool(h['tracks_value']) if 'tracks_value' in h.keys() else False,
-            'value_unit': h['value_unit'] if 'value_unit' in h.keys() else None,
-            'value_aggregation_type': h['value_aggregation_type'] if 'value_aggregation_type' in h.keys() else 'absolute',
-            'categories': h['categories'] if 'categories' in h.keys() else None,
-            'created_at': h['created_at']
+            'id': habit_id,
+            'name': name,
+            'is_active': bool(is_active),
+            'is_public': bool(is_public),
+            'order_index': order_index,
+            'tracks_value': bool(tracks_value),
+            'value_unit': value_unit,
+            'value_aggregation_type': value_aggregation_type,
+            'categories': categories,
+            'created_at': created_at
         }
-        for h in habits
+        for (habit_id, name, is_active, is_public, order_index, tracks_value,
+             value_unit, value_aggregation_type, categories, created_at) in habits
     ]
 
-    return jsonify({'habits': habits_list})
+    habits_data = {'habits': habits_list}
+    set_cached(cache_key, habits_data)
+
+    return habits_data
 
 
 @admin_bp.route('/api/habits', methods=['POST'])
@@ -229,9 +305,6 @@ def create_new_habit():
         categories=categories
     )
 
-    # Invalidate dashboard cache
-    invalidate_dashboard_cache()
-
     return jsonify({
         'success': True,
         'habit_id': habit_id,
@@ -308,9 +381,6 @@ def update_existing_habit(habit_id):
     # Update habit
     update_habit(habit_id, **updates)
 
-    # Invalidate dashboard cache
-    invalidate_dashboard_cache()
-
     return jsonify({
         'success': True,
         'message': 'Habit updated successfully'
@@ -334,9 +404,6 @@ def delete_existing_habit(habit_id):
     # Soft delete
     delete_habit(habit_id)
 
-    # Invalidate dashboard cache
-    invalidate_dashboard_cache()
-
     return jsonify({
         'success': True,
         'message': 'Habit deleted successfully'
@@ -370,9 +437,6 @@ def reorder_habits_endpoint():
     # Reorder habits
     count = reorder_habits(habit_ids)
 
-    # Invalidate dashboard cache (order affects display)
-    invalidate_dashboard_cache()
-
     return jsonify({
         'success': True,
         'message': f'Reordered {count} habits'
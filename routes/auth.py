@@ -4,6 +4,7 @@ import secrets
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash
 from config import Config
 from utils.decorators import already_logged_in
+from utils.static_pages import render_static_template
 
 # Create authentication blueprint
 auth_bp = Blueprint('auth', __name__)
@@ -37,8 +38,8 @@ def login():
             flash('Invalid password. Please try again.', 'error')
             return render_template('admin/login.html', error=True)
 
-    # GET request - show login form
-    return render_template('admin/login.html')
+    # GET request - show login form (rendered once, then reused)
+    return render_static_template('admin/login.html')
 
 
 @auth_bp.route('/logout')
@@ -1,11 +1,227 @@
 """Public routes for the dashboard."""
 
-from flask import Blueprint, render_template, jsonify, request
-from services import get_public_dashboard_data, get_yearly_heatmap_data, get_archived_habits_data, get_cached, set_cached
+import gzip
+import hashlib
+import os
+import threading
+import time
+from datetime import date, datetime
+from flask import Blueprint, jsonify, request, current_app
+from config import Config
+from services import get_public_dashboard_data, get_yearly_heatmap_data, get_archived_habits_data, get_cached, set_cached, shrink_keys, versioned_key
+from utils.server_timing import timed
+from utils.static_pages import render_static_template
 
 # Create public blueprint
 public_bp = Blueprint('public', __name__)
 
+# Responses smaller than this aren't worth compressing
+GZIP_MIN_SIZE = 500
+GZIP_LEVEL = 6
+
+# Accepted heatmap years (upper bound fixed at import; a decade of headroom
+# makes staleness in long-running workers harmless)
+MIN_YEAR = 2000
+MAX_YEAR = datetime.now().year + 10
+
+# Seconds between checks for dashboard responses missing from the cache
+WARM_CHECK_INTERVAL = 30
+
+# Process that started the cache warmer (at most one per process)
+_warmer_pid = None
+
+# One lock per unversioned cache key, so concurrent misses build once
+# (keys are a small fixed set: the endpoints plus the valid heatmap years)
+_fill_locks = {}
+
+
+# Builders time their own steps: queries as 'db', key shortening as 'enc'
+def build_dashboard_json():
+    """Public dashboard data, with repeated per-log keys shortened."""
+    with timed('db'):
+        data = get_public_dashboard_data(days=30)
+    with timed('enc'):
+        return shrink_keys(data)
+
+
+def build_heatmap_json(year=None):
+    """Yearly heatmap data, with repeated per-day keys shortened."""
+    with timed('db'):
+        data = get_yearly_heatmap_data(year=year)
+    with timed('enc'):
+        return shrink_keys(data)
+
+
+def build_archived_json():
+    """Archived habits with lifetime statistics."""
+    with timed('db'):
+        return get_archived_habits_data()
+
+
+# Responses kept warm by the background warmer: (cache key, builder)
+WARM_RESPONSES = (
+    ('public_dashboard_json', build_dashboard_json),
+    ('heatmap_data_current', build_heatmap_json),
+    ('archived_habits_data', build_archived_json),
+)
+
+
+def fill_json_cache(cache_key, build_data):
+    """
+    Serialize, compress, and hash data, and cache the result.
+
+    Requires an app context (for the JSON provider).
+
+    Args:
+        cache_key: Stamped cache key (see response_cache_key)
+        build_data: Builder returning the data to serialize (it records
+                    its own 'db' timing, see build_dashboard_json)
+
+    Returns:
+        Tuple of (body, gzip body or None, ETag)
+    """
+    data = build_data()
+
+    with timed('enc'):
+        body = current_app.json.response(data).get_data()
+        # Compress and hash once per cache fill rather than once per request
+        gzip_body = gzip.compress(body, GZIP_LEVEL) if len(body) >= GZIP_MIN_SIZE else None
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+    cached = (body, gzip_body, etag)
+    set_cached(cache_key, cached)
+    return cached
+
+
+def response_cache_key(cache_key):
+    """
+    Stamp a response cache key with the data version and today's date.
+
+    Dashboard data is relative to today (date windows, streaks, the current
+    year), so entries must not outlive the day they were built on, even
+    when no data changed.
+
+    Args:
+        cache_key: Unversioned cache key
+
+    Returns:
+        Key string like 'public_dashboard_json:42:2024-06-01'
+    """
+    return f'{versioned_key(cache_key)}:{date.today().isoformat()}'
+
+
+def get_json_entry(cache_key, build_data, force=False):
+    """
+    Get the cached serialized response for a key, building it on a miss.
+
+    Concurrent misses for the same key wait for a single build instead of
+    each building (and holding) their own copy of the payload.
+
+    Args:
+        cache_key: Unversioned cache key
+        build_data: Callable returning the data to serialize
+        force: If True, rebuild even if a cached entry exists
+
+    Returns:
+        Tuple of (body, gzip body or None, ETag)
+    """
+    with timed('cache'):
+        cached = None if force else get_cached(response_cache_key(cache_key))
+    if cached is not None:
+        return cached
+
+    with _fill_locks.setdefault(cache_key, threading.Lock()):
+        # Another request may have filled it while we waited
+        versioned = response_cache_key(cache_key)
+        cached = None if force else get_cached(versioned)
+        if cached is None:
+            cached = fill_json_cache(versioned, build_data)
+    return cached
+
+
+def cached_json_response(cache_key, build_data):
+    """
+    Return a JSON response, caching the serialized (and gzipped) bytes.
+
+    Cache hits skip JSON serialization and compression entirely, and
+    clients revalidating with a matching ETag get an empty 304.
+
+    Args:
+        cache_key: Cache key for the serialized response body (stamped with
+                   the data version and date, so writes and day changes
+                   invalidate it)
+        build_data: Callable returning the data to serialize on a cache miss
+
+    Returns:
+        Flask response
+    """
+    body, gzip_body, etag = get_json_entry(cache_key, build_data)
+
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    elif gzip_body is not None and request.accept_encodings['gzip']:
+        response = current_app.response_class(gzip_body, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = current_app.response_class(body, mimetype='application/json')
+
+    # Weak ETag: the gzip and plain encodings share it
+    response.set_etag(etag, weak=True)
+    # Revalidate on every use so edits show up immediately (usually a 304)
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def warm_dashboard_cache(force=False):
+    """
+    Build any public dashboard responses missing from the cache.
+
+    Requires an app context.
+
+    Args:
+        force: If True, rebuild every response (resets their TTL)
+    """
+    for cache_key, build_data in WARM_RESPONSES:
+        get_json_entry(cache_key, build_data, force=force)
+
+
+def start_cache_warmer(app):
+    """
+    Start a daemon thread that keeps the public dashboard responses cached.
+
+    Missing responses (e.g. after a data change) are rebuilt every
+    WARM_CHECK_INTERVAL seconds, and all of them are rebuilt shortly
+    before they would expire, so visitors don't pay for a cold cache.
+    Starts at most one thread per process, so it is cheap to call on every
+    request (create_app does, when CACHE_WARMING is enabled).
+
+    Args:
+        app: Flask application (provides the app context)
+    """
+    global _warmer_pid
+    if _warmer_pid == os.getpid():
+        return
+    _warmer_pid = os.getpid()
+
+    refresh_interval = max(Config.CACHE_DURATION - 60, WARM_CHECK_INTERVAL)
+
+    def warm():
+        last_refresh = None
+        while True:
+            force = last_refresh is None or time.monotonic() - last_refresh >= refresh_interval
+            try:
+                with app.app_context():
+                    warm_dashboard_cache(force=force)
+                if force:
+                    last_refresh = time.monotonic()
+            except Exception as e:
+                # Requests still fill the cache themselves; retry next tick
+                app.logger.warning('Dashboard cache warm-up failed: %s', e)
+            time.sleep(WARM_CHECK_INTERVAL)
+
+    threading.Thread(target=warm, name='cache-warmer', daemon=True).start()
+
 
 @public_bp.route('/')
 def index():
@@ -15,7 +231,8 @@ def index():
     SECURITY: Only shows habits where is_public = True.
     Uses caching to reduce database load.
     """
-    return render_template('public/dashboard.html')
+    # Data comes from the AJAX endpoints, so the page itself is static
+    return render_static_template('public/dashboard.html')
 
 
 @public_bp.route('/api/dashboard/data')
@@ -29,19 +246,9 @@ def dashboard_data():
     Returns:
         JSON with habits, logs, streaks, and completion rates
     """
-    # Check cache first
-    cached_data = get_cached('public_dashboard_json')
-    if cached_data:
-        return jsonify(cached_data)
-
-    # Fetch fresh data
     # SECURITY: get_public_dashboard_data only returns is_public=True habits
-    dashboard = get_public_dashboard_data(days=30)
-
-    # Cache the result
-    set_cached('public_dashboard_json', dashboard)
-
-    return jsonify(dashboard)
+    # Repeated per-log keys are shortened (see shrink_keys)
+    return cached_json_response('public_dashboard_json', build_dashboard_json)
 
 
 @public_bp.route('/api/dashboard/heatmap')
@@ -67,8 +274,7 @@ def heatmap_data():
         try:
             year = int(year_param)
             # Validate year is reasonable (between 2000 and current year + 10)
-            current_year = __import__('datetime').datetime.now().year
-            if year < 2000 or year > current_year + 10:
+            if year < MIN_YEAR or year > MAX_YEAR:
                 return jsonify({'error': 'Invalid year parameter'}), 400
         except ValueError:
             return jsonify({'error': 'Year must be an integer'}), 400
@@ -76,19 +282,9 @@ def heatmap_data():
     # Create cache key based on year
     cache_key = f'heatmap_data_{year or "current"}'
 
-    # Check cache first
-    cached_data = get_cached(cache_key)
-    if cached_data:
-        return jsonify(cached_data)
-
-    # Fetch fresh data
     # SECURITY: get_yearly_heatmap_data only returns is_public=True habits
-    heatmap = get_yearly_heatmap_data(year=year)
-
-    # Cache the result
-    set_cached(cache_key, heatmap)
-
-    return jsonify(heatmap)
+    # Repeated per-day keys are shortened (see shrink_keys)
+    return cached_json_response(cache_key, lambda: build_heatmap_json(year))
 
 
 @public_bp.route('/api/dashboard/archived')
@@ -101,16 +297,5 @@ def archived_habits():
     Returns:
         JSON list of archived habits with lifetime statistics
     """
-    # Check cache first
-    cached_data = get_cached('archived_habits_data')
-    if cached_data:
-        return jsonify(cached_data)
-
-    # Fetch fresh data
     # SECURITY: get_archived_habits_data only returns is_public=True habits
-    archived = get_archived_habits_data()
-
-    # Cache the result
-    set_cached('archived_habits_data', archived)
-
-    return jsonify(archived)
+    return cached_json_response('archived_habits_data', build_archived_json)
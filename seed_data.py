@@ -1,7 +1,8 @@
 """Seed the database with sample data for testing."""
 
+import random
 from datetime import datetime, timedelta
-from services import create_habit, upsert_log
+from services import create_habit, bulk_upsert_logs
 
 
 def seed_database():
@@ -14,11 +15,13 @@ def seed_database():
     habit3_id = create_habit("Read for 30 min", is_public=True)
     habit4_id = create_habit("Private Journal", is_public=False)  # This won't show on public dashboard
 
-    print(f"✓ Created habits:")
-    print(f"  - Morning Exercise (ID: {habit1_id})")
-    print(f"  - Drink Water (ID: {habit2_id})")
-    print(f"  - Read for 30 min (ID: {habit3_id})")
-    print(f"  - Private Journal (ID: {habit4_id}, private)")
+    print("\n".join([
+        "✓ Created habits:",
+        f"  - Morning Exercise (ID: {habit1_id})",
+        f"  - Drink Water (ID: {habit2_id})",
+        f"  - Read for 30 min (ID: {habit3_id})",
+        f"  - Private Journal (ID: {habit4_id}, private)",
+    ]))
 
     # Add logs for the past 30 days
     today = datetime.now().date()
@@ -30,19 +33,22 @@ def seed_database():
         (habit4_id, 0.7),  # 70% completion rate (private)
     ]
 
-    import random
-    random.seed(42)  # Consistent random data
+    # Seeded generator for consistent data, without touching global random state
+    draw = random.Random(42).random
 
-    for habit_id, completion_rate in habits:
-        for days_ago in range(30):
-            date = today - timedelta(days=days_ago)
-            # Random completion based on rate
-            status = random.random() < completion_rate
-            upsert_log(habit_id, date, status)
+    # Random completion based on rate, saved in one transaction
+    rows = [
+        (habit_id, today - timedelta(days=days_ago), draw() < completion_rate)
+        for habit_id, completion_rate in habits
+        for days_ago in range(30)
+    ]
+    bulk_upsert_logs(rows)
 
-    print(f"\n✓ Added 30 days of log data for each habit")
-    print("\n✓ Database seeded successfully!")
-    print("\nYou can now view the dashboard at: http://localhost:5000/")
+    print("\n".join([
+        "\n✓ Added 30 days of log data for each habit",
+        "\n✓ Database seeded successfully!",
+        "\nYou can now view the dashboard at: http://localhost:5000/",
+    ]))
 
 
 if __name__ == '__main__':
@@ -1,74 +1,66 @@
-"""Service layer for business logic."""
+"""Service layer for business logic.
 
-from .habit_service import (
-    get_all_habits,
-    get_active_habits,
-    get_habit_by_id,
-    create_habit,
-    update_habit,
-    reorder_habits,
-    delete_habit,
-    hard_delete_habit
-)
+Service functions are loaded lazily (PEP 562) so importing a single
+submodule, e.g. ``services.habit_service``, does not pull in the rest
+of the service layer.
+"""
 
-from .log_service import (
-    get_logs_for_date,
-    get_logs_for_habit,
-    upsert_log,
-    delete_log,
-    get_habit_streak,
-    save_day_logs,
-    get_completion_stats,
-    get_value_stats
-)
+import importlib
 
-from .dashboard_service import (
-    get_public_dashboard_data,
-    get_admin_tracking_data,
-    get_habit_history_chart_data,
-    get_yearly_heatmap_data,
-    get_archived_habits_data
-)
-
-from .cache_service import (
-    cache,
-    get_cached,
-    set_cached,
-    invalidate_cache,
-    clear_all_cache,
-    invalidate_dashboard_cache
-)
-
-__all__ = [
+# Maps each public name to the submodule that defines it
+_LAZY_IMPORTS = {
     # Habit service
-    'get_all_habits',
-    'get_active_habits',
-    'get_habit_by_id',
-    'create_habit',
-    'update_habit',
-    'reorder_habits',
-    'delete_habit',
-    'hard_delete_habit',
+    'get_all_habits': 'habit_service',
+    'get_active_habits': 'habit_service',
+    'get_habit_by_id': 'habit_service',
+    'create_habit': 'habit_service',
+    'update_habit': 'habit_service',
+    'reorder_habits': 'habit_service',
+    'delete_habit': 'habit_service',
+    'hard_delete_habit': 'habit_service',
     # Log service
-    'get_logs_for_date',
-    'get_logs_for_habit',
-    'upsert_log',
-    'delete_log',
-    'get_habit_streak',
-    'save_day_logs',
-    'get_completion_stats',
-    'get_value_stats',
+    'get_logs_for_date': 'log_service',
+    'get_logs_for_habit': 'log_service',
+    'upsert_log': 'log_service',
+    'delete_log': 'log_service',
+    'get_habit_streak': 'log_service',
+    'save_day_logs': 'log_service',
+    'bulk_upsert_logs': 'log_service',
+    'get_completion_stats': 'log_service',
+    'get_completion_stats_for_habits': 'log_service',
+    'get_current_streaks': 'log_service',
+    'get_value_stats': 'log_service',
     # Dashboard service
-    'get_public_dashboard_data',
-    'get_admin_tracking_data',
-    'get_habit_history_chart_data',
-    'get_yearly_heatmap_data',
-    'get_archived_habits_data',
+    'get_public_dashboard_data': 'dashboard_service',
+    'get_admin_tracking_data': 'dashboard_service',
+    'get_habit_history_chart_data': 'dashboard_service',
+    'get_yearly_heatmap_data': 'dashboard_service',
+    'get_archived_habits_data': 'dashboard_service',
+    'shrink_keys': 'dashboard_service',
     # Cache service
-    'cache',
-    'get_cached',
-    'set_cached',
-    'invalidate_cache',
-    'clear_all_cache',
-    'invalidate_dashboard_cache'
-]
+    'cache': 'cache_service',
+    'get_cached': 'cache_service',
+    'set_cached': 'cache_service',
+    'invalidate_cache': 'cache_service',
+    'clear_all_cache': 'cache_service',
+    'get_data_version': 'cache_service',
+    'versioned_key': 'cache_service',
+    'invalidate_dashboard_cache': 'cache_service'
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name):
+    """Import a service function from its submodule on first access."""
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module = importlib.import_module(f'.{_LAZY_IMPORTS[name]}', __name__)
+    value = getattr(module, name)
+    globals()[name] = value  # Skip __getattr__ on subsequent lookups
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,20 +1,42 @@
-"""Simple in-memory cache service with timestamp-based expiration."""
+"""Cache service with an in-memory backend and an optional Redis backend."""
 
+import os
+import pickle
+import threading
 import time
+from collections import OrderedDict
 from config import Config
+from models import get_db
+
+# Seconds between background sweeps of expired in-memory entries
+CLEANUP_INTERVAL = 60
+
+# Shared data version, bumped by triggers on every habit or log write
+DATA_VERSION_QUERY = "SELECT version FROM data_version WHERE id = 1"
 
 
 class CacheService:
     """
-    Simple in-memory cache with timestamp-based expiration.
+    Simple in-memory cache with deadline-based expiration.
+
+    Holds at most maxsize entries, evicting the least recently used, so
+    distinct keys (e.g. one per heatmap year, or keys orphaned by a data
+    version bump) can't grow memory without bound.
 
-    For a single-user application, this is sufficient. Can be upgraded
-    to Redis or similar if needed for multi-worker deployments.
+    For a single-user application, this is sufficient. Multi-worker
+    deployments can set REDIS_URL to share one cache (see RedisCacheService).
     """
 
-    def __init__(self):
-        """Initialize cache storage."""
-        self._cache = {}
+    def __init__(self, maxsize=None):
+        """
+        Initialize cache storage.
+
+        Args:
+            maxsize: Maximum number of entries (default: from config)
+        """
+        self._cache = OrderedDict()
+        self._maxsize = maxsize if maxsize is not None else Config.CACHE_MAXSIZE
+        self._cleanup_pid = None
 
     def get(self, key):
         """
@@ -26,17 +48,19 @@ class CacheService:
         Returns:
             Cached value or None if not found or expired
         """
-        if key not in self._cache:
+        entry = self._cache.get(key)
+        if entry is None:
             return None
 
-        value, timestamp, duration = self._cache[key]
+        value, deadline = entry
 
         # Check if cache entry has expired
-        if time.time() - timestamp > duration:
-            # Cache expired, remove it
-            del self._cache[key]
+        if time.monotonic() >= deadline:
+            # Cache expired, remove it (pop tolerates a concurrent removal)
+            self._cache.pop(key, None)
             return None
 
+        self._touch(key)
         return value
 
     def set(self, key, value, duration=None):
@@ -51,7 +75,23 @@ class CacheService:
         if duration is None:
             duration = Config.CACHE_DURATION
 
-        self._cache[key] = (value, time.time(), duration)
+        # Store the expiry deadline so reads need a single comparison
+        self._cache[key] = (value, time.monotonic() + duration)
+        self._touch(key)
+
+        # Evict least recently used entries beyond the size limit
+        while len(self._cache) > self._maxsize:
+            try:
+                self._cache.popitem(last=False)
+            except KeyError:
+                break  # Emptied concurrently
+
+    def _touch(self, key):
+        """Mark an entry as most recently used."""
+        try:
+            self._cache.move_to_end(key)
+        except KeyError:
+            pass  # Removed concurrently (e.g. by the cleanup sweep)
 
     def invalidate(self, key):
         """
@@ -60,8 +100,7 @@ class CacheService:
         Args:
             key: Cache key to invalidate
         """
-        if key in self._cache:
-            del self._cache[key]
+        self._cache.pop(key, None)
 
     def clear(self):
         """Clear all cache entries."""
@@ -83,6 +122,9 @@ class CacheService:
         """
         Get cache statistics.
 
+        Scans the cache for expired entries (not yet removed by the
+        background sweep), so it is meant for diagnostics only.
+
         Returns:
             Dictionary with cache stats:
             {
@@ -91,22 +133,16 @@ class CacheService:
                 'expired_entries': int
             }
         """
+        current_time = time.monotonic()
         total_entries = len(self._cache)
-        active_entries = 0
-        expired_entries = 0
-
-        current_time = time.time()
-
-        for key in list(self._cache.keys()):
-            value, timestamp, duration = self._cache[key]
-            if current_time - timestamp > duration:
-                expired_entries += 1
-            else:
-                active_entries += 1
+        expired_entries = sum(
+            1 for value, deadline in list(self._cache.values())
+            if current_time >= deadline
+        )
 
         return {
             'total_entries': total_entries,
-            'active_entries': active_entries,
+            'active_entries': total_entries - expired_entries,
             'expired_entries': expired_entries
         }
 
@@ -117,21 +153,112 @@ class CacheService:
         Returns:
             Number of entries removed
         """
-        current_time = time.time()
-        expired_keys = []
-
-        for key, (value, timestamp, duration) in self._cache.items():
-            if current_time - timestamp > duration:
-                expired_keys.append(key)
+        current_time = time.monotonic()
+        expired_keys = [
+            key for key, (value, deadline) in list(self._cache.items())
+            if current_time >= deadline
+        ]
 
         for key in expired_keys:
-            del self._cache[key]
+            self._cache.pop(key, None)
 
         return len(expired_keys)
 
+    def start_cleanup(self, interval=CLEANUP_INTERVAL):
+        """
+        Start a daemon thread that removes expired entries periodically.
+
+        Safe to call more than once; starts at most one thread per process.
+
+        Args:
+            interval: Seconds between sweeps
+        """
+        if self._cleanup_pid == os.getpid():
+            return
+        self._cleanup_pid = os.getpid()
+
+        def sweep():
+            while True:
+                time.sleep(interval)
+                self.cleanup_expired()
+
+        threading.Thread(target=sweep, name='cache-cleanup', daemon=True).start()
+
+
+class RedisCacheService:
+    """
+    Redis-backed cache shared by all worker processes.
+
+    Same interface as CacheService. Redis handles expiration natively,
+    so entries are stored with a TTL and never checked on read.
+    """
+
+    # Namespace for all keys, so clear() never touches other apps' data
+    KEY_PREFIX = 'health-tracker:'
+
+    def __init__(self, url):
+        """
+        Connect to Redis.
+
+        Args:
+            url: Redis URL, e.g. 'redis://localhost:6379/0'
+        """
+        import redis  # Optional dependency, only needed when REDIS_URL is set
+
+        self._redis = redis.Redis.from_url(url)
+
+    def get(self, key):
+        """Get a cached value, or None if not found or expired."""
+        data = self._redis.get(self.KEY_PREFIX + key)
+        return pickle.loads(data) if data is not None else None
+
+    def set(self, key, value, duration=None):
+        """Set a cache value that expires after duration seconds."""
+        if duration is None:
+            duration = Config.CACHE_DURATION
+
+        self._redis.setex(self.KEY_PREFIX + key, duration, pickle.dumps(value))
+
+    def invalidate(self, key):
+        """Invalidate (delete) a specific cache entry."""
+        self._redis.delete(self.KEY_PREFIX + key)
+
+    def clear(self):
+        """Clear all cache entries."""
+        keys = list(self._redis.scan_iter(match=self.KEY_PREFIX + '*'))
+        if keys:
+            self._redis.delete(*keys)
+
+    def has(self, key):
+        """Check if a key exists in cache and hasn't expired."""
+        return bool(self._redis.exists(self.KEY_PREFIX + key))
+
+    def get_stats(self):
+        """Get cache statistics (Redis evicts expired entries itself)."""
+        total_entries = sum(1 for _ in self._redis.scan_iter(match=self.KEY_PREFIX + '*'))
+        return {
+            'total_entries': total_entries,
+            'active_entries': total_entries,
+            'expired_entries': 0
+        }
+
+    def cleanup_expired(self):
+        """No-op: Redis removes expired entries itself."""
+        return 0
+
+    def start_cleanup(self, interval=CLEANUP_INTERVAL):
+        """No-op: Redis removes expired entries itself."""
+
+
+def create_cache():
+    """Create the cache backend: Redis if REDIS_URL is set, else in-memory."""
+    if Config.REDIS_URL:
+        return RedisCacheService(Config.REDIS_URL)
+    return CacheService()
+
 
 # Global cache instance
-cache = CacheService()
+cache = create_cache()
 
 
 # Convenience functions for common cache operations
@@ -156,17 +283,44 @@ def clear_all_cache():
     cache.clear()
 
 
+def get_data_version():
+    """
+    Get the current data version.
+
+    The version lives in the database and is bumped by triggers in the same
+    transaction as every habit or log write, so every worker process sees
+    the same value (an in-process counter would leave other workers stale).
+
+    Returns:
+        Integer that increases every time habit or log data changes
+    """
+    rows = get_db().execute_query(DATA_VERSION_QUERY, as_tuples=True)
+    return rows[0][0] if rows else 0
+
+
+def versioned_key(key):
+    """
+    Stamp a cache key with the current data version.
+
+    Entries stored under a versioned key are orphaned as soon as the data
+    version changes, and expire with their TTL.
+
+    Args:
+        key: Base cache key (e.g. 'public_dashboard_json')
+
+    Returns:
+        Key string like 'public_dashboard_json:42'
+    """
+    return f'{key}:{get_data_version()}'
+
+
 def invalidate_dashboard_cache():
     """
     Invalidate all dashboard-related cache entries.
-    Should be called whenever habit or log data is modified.
+
+    Habit and log writes already bump the data version through triggers;
+    call this only for changes those triggers can't see. Bumping the
+    version orphans every versioned key (all dashboard, heatmap, archived
+    and admin habit entries) at once.
     """
-    cache.invalidate('public_dashboard_data')
-    cache.invalidate('public_dashboard_json')
-    cache.invalidate('archived_habits_data')
-
-    # Invalidate all heatmap cache entries (all years)
-    # Keys look like: 'heatmap_data_2025', 'heatmap_data_current', etc.
-    keys_to_remove = [key for key in cache._cache.keys() if key.startswith('heatmap_data_')]
-    for key in keys_to_remove:
-        cache.invalidate(key)
+    get_db().execute_update("UPDATE data_version SET version = version + 1 WHERE id = 1")
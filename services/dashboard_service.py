@@ -1,10 +1,60 @@
 """Dashboard service for aggregating data for public dashboard."""
 
-from datetime import datetime, timedelta
+from datetime import date as date_type, datetime, timedelta
+from bisect import bisect_right
 from calendar import monthrange
 from models import get_db
 from services.habit_service import get_active_habits
-from services.log_service import get_habit_streak, get_completion_stats, get_value_stats
+from services.log_service import get_current_streaks, summarize_completion, summarize_values
+
+# Short names for keys repeated in every log / heatmap day of the dashboard
+# payloads. Expanded again by expandKeys() in static/js/dashboard.js.
+PAYLOAD_KEY_MAP = {
+    'date': 'd',
+    'status': 's',
+    'value': 'v',
+    'category': 'c',
+    'day_of_month': 'dm',
+    'completion_percentage': 'p',
+    'completed_count': 'cc',
+    'total_count': 'tc'
+}
+
+
+def shrink_keys(data):
+    """
+    Compact a dashboard payload for the wire.
+
+    Repeated keys are replaced with short names, and lists of dicts that
+    all share the same keys are stored column-wise as {'_col': {key: [...]}}
+    so each key appears once per list instead of once per item.
+
+    The returned dict carries a '_k' legend (short name -> original key)
+    so clients can restore the original keys (see expandKeys in dashboard.js).
+
+    Args:
+        data: Dashboard payload dict (e.g. from get_public_dashboard_data)
+
+    Returns:
+        New dict with shortened keys and columnar lists, plus the '_k' legend
+    """
+    def shrink(obj):
+        if isinstance(obj, dict):
+            return {PAYLOAD_KEY_MAP.get(key, key): shrink(value) for key, value in obj.items()}
+        if isinstance(obj, list):
+            if len(obj) > 1 and all(isinstance(item, dict) for item in obj):
+                keys = obj[0].keys()
+                if all(item.keys() == keys for item in obj):
+                    return {'_col': {
+                        PAYLOAD_KEY_MAP.get(key, key): [shrink(item[key]) for item in obj]
+                        for key in keys
+                    }}
+            return [shrink(item) for item in obj]
+        return obj
+
+    shrunk = shrink(data)
+    shrunk['_k'] = {short: key for key, short in PAYLOAD_KEY_MAP.items()}
+    return shrunk
 
 
 def get_public_dashboard_data(days=30):
@@ -45,58 +95,78 @@ def get_public_dashboard_data(days=30):
     end_date = datetime.now().date()
     start_date = end_date - timedelta(days=days - 1)
 
+    start_str = start_date.isoformat()
+    end_str = end_date.isoformat()
+
     dashboard_data = {
         'habits': [],
         'date_range': {
-            'start': start_date.strftime('%Y-%m-%d'),
-            'end': end_date.strftime('%Y-%m-%d')
+            'start': start_str,
+            'end': end_str
         }
     }
 
+    if not public_habits:
+        return dashboard_data
+
     db = get_db()
 
+    habit_ids = [habit['id'] for habit in public_habits]
+    placeholders = ','.join('?' * len(habit_ids))
+
+    # Get logs in the date range for all habits at once
+    logs_query = f"""
+        SELECT habit_id, date, status, value, category
+        FROM logs
+        WHERE habit_id IN ({placeholders})
+          AND date >= ?
+          AND date <= ?
+        ORDER BY habit_id, date ASC
+    """
+    # Plain (date, status, value, category) tuples per habit
+    logs_by_habit = {habit_id: [] for habit_id in habit_ids}
+    for habit_id, *log in db.execute_query(logs_query, tuple(habit_ids) + (start_str, end_str), as_tuples=True):
+        logs_by_habit[habit_id].append(log)
+
+    # Current streaks for all habits at once
+    streaks = get_current_streaks(habit_ids, end_date)
+
+    # Week/month/year value totals for cumulative habits (see get_cumulative_totals)
+    cumulative_ids = [
+        habit['id'] for habit in public_habits
+        if habit['tracks_value'] and habit['value_aggregation_type'] == 'cumulative'
+    ]
+    cumulative_totals = get_cumulative_totals(cumulative_ids, end_date)
+
     for habit in public_habits:
         habit_id = habit['id']
-
-        # Get logs for this habit in the date range
-        logs_query = """
-            SELECT date, status, value, category
-            FROM logs
-            WHERE habit_id = ?
-              AND date >= ?
-              AND date <= ?
-            ORDER BY date ASC
-        """
-        logs = db.execute_query(
-            logs_query,
-            (habit_id, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
-        )
+        logs = logs_by_habit[habit_id]
 
         # Convert logs to list of dicts
         logs_list = [
             {
-                'date': log['date'],
-                'status': bool(log['status']),
-                'value': log['value'],
-                'category': log['category']
+                'date': log_date,
+                'status': bool(status),
+                'value': value,
+                'category': category
             }
-            for log in logs
+            for log_date, status, value, category in logs
         ]
 
         # Get streak information
-        streak_info = get_habit_streak(habit_id)
+        streak_info = streaks[habit_id]
 
         # Get completion statistics
-        stats = get_completion_stats(habit_id, days)
+        stats = summarize_completion(sum(1 for _, status, _, _ in logs if status), days)
 
         habit_data = {
             'id': habit_id,
             'name': habit['name'],
             'created_at': habit['created_at'],
-            'tracks_value': bool(habit['tracks_value']) if 'tracks_value' in habit.keys() else False,
-            'value_unit': habit['value_unit'] if 'value_unit' in habit.keys() else None,
-            'value_aggregation_type': habit['value_aggregation_type'] if 'value_aggregation_type' in habit.keys() else 'absolute',
-            'categories': habit['categories'] if 'categories' in habit.keys() else None,
+            'tracks_value': bool(habit['tracks_value']),
+            'value_unit': habit['value_unit'],
+            'value_aggregation_type': habit['value_aggregation_type'],
+            'categories': habit['categories'],
             'current_streak': streak_info['current_streak'],
             'completion_rate': stats['completion_rate'],
             'completed_days': stats['completed_days'],
@@ -105,17 +175,18 @@ def get_public_dashboard_data(days=30):
         }
 
         # Add value statistics if the habit tracks values
-        if 'tracks_value' in habit.keys() and habit['tracks_value']:
-            value_stats = get_value_stats(habit_id, days)
-            habit_data['value_stats'] = value_stats
+        if habit['tracks_value']:
+            # Values newest first, as get_value_stats returns them
+            values = [value for _, _, value, _ in reversed(logs) if value is not None]
+            habit_data['value_stats'] = summarize_values(values)
 
             # Add aggregated statistics for cumulative habits
-            aggregation_type = habit['value_aggregation_type'] if 'value_aggregation_type' in habit.keys() else 'absolute'
-            if aggregation_type == 'cumulative':
+            if habit['value_aggregation_type'] == 'cumulative':
+                week, month, year = cumulative_totals.get(habit_id, (0.0, 0.0, 0.0))
                 habit_data['value_aggregations'] = {
-                    'week': get_cumulative_total(habit_id, 7),
-                    'month': get_cumulative_total(habit_id, 30),
-                    'year': get_cumulative_total(habit_id, 365)
+                    'week': week,
+                    'month': month,
+                    'year': year
                 }
 
         dashboard_data['habits'].append(habit_data)
@@ -123,12 +194,12 @@ def get_public_dashboard_data(days=30):
     return dashboard_data
 
 
-def get_admin_tracking_data(date):
+def get_admin_tracking_data(date_str):
     """
     Get data for the admin tracking interface for a specific date.
 
     Args:
-        date: Date string in 'YYYY-MM-DD' format or datetime object
+        date_str: Date string in 'YYYY-MM-DD' format
 
     Returns:
         Dictionary with:
@@ -146,62 +217,42 @@ def get_admin_tracking_data(date):
             ]
         }
     """
-    # Convert datetime to string if needed
-    if isinstance(date, datetime):
-        date_str = date.strftime('%Y-%m-%d')
-    else:
-        date_str = date
-
-    # Get all active habits (including private)
-    habits = get_active_habits(include_private=True)
-
     db = get_db()
 
-    # Get existing logs for this date
-    logs_query = """
-        SELECT habit_id, status, value, category
-        FROM logs
-        WHERE date = ?
+    # All active habits (including private) with their log for this date, if any
+    query = """
+        SELECT h.id, h.name, h.is_public, h.order_index, h.tracks_value, h.value_unit,
+               h.value_aggregation_type, h.categories,
+               l.habit_id IS NOT NULL, l.status, l.value, l.category
+        FROM habits h
+        LEFT JOIN logs l ON l.habit_id = h.id AND l.date = ?
+        WHERE h.is_active = 1
+        ORDER BY h.order_index ASC, h.created_at ASC
     """
-    logs = db.execute_query(logs_query, (date_str,))
-
-    # Create a mapping of habit_id to status, value, and category
-    logs_map = {
-        log['habit_id']: {
-            'status': bool(log['status']),
-            'value': log['value'],
-            'category': log['category']
-        }
-        for log in logs
-    }
+    rows = db.execute_query(query, (date_str,), as_tuples=True)
 
     tracking_data = {
         'date': date_str,
-        'habits': []
+        'habits': [
+            {
+                'id': habit_id,
+                'name': name,
+                'is_public': bool(is_public),
+                'order_index': order_index,
+                'tracks_value': bool(tracks_value),
+                'value_unit': value_unit,
+                'value_aggregation_type': value_aggregation_type,
+                'categories': categories,
+                'is_logged': bool(is_logged),
+                'status': bool(status),
+                'value': value,
+                'category': category
+            }
+            for (habit_id, name, is_public, order_index, tracks_value, value_unit,
+                 value_aggregation_type, categories, is_logged, status, value, category) in rows
+        ]
     }
 
-    for habit in habits:
-        habit_id = habit['id']
-        is_logged = habit_id in logs_map
-        log_data = logs_map.get(habit_id, {'status': False, 'value': None, 'category': None})
-
-        habit_data = {
-            'id': habit_id,
-            'name': habit['name'],
-            'is_public': bool(habit['is_public']),
-            'order_index': habit['order_index'],
-            'tracks_value': bool(habit['tracks_value']) if 'tracks_value' in habit.keys() else False,
-            'value_unit': habit['value_unit'] if 'value_unit' in habit.keys() else None,
-            'value_aggregation_type': habit['value_aggregation_type'] if 'value_aggregation_type' in habit.keys() else 'absolute',
-            'categories': habit['categories'] if 'categories' in habit.keys() else None,
-            'is_logged': is_logged,
-            'status': log_data['status'],
-            'value': log_data['value'],
-            'category': log_data['category']
-        }
-
-        tracking_data['habits'].append(habit_data)
-
     return tracking_data
 
 
@@ -237,25 +288,18 @@ def get_habit_history_chart_data(habit_id, days=90):
     """
     logs = db.execute_query(
         query,
-        (habit_id, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+        (habit_id, start_date.isoformat(), end_date.isoformat()),
+        as_tuples=True
     )
 
     # Create a mapping of date to status and value
-    logs_map = {log['date']: {'status': int(log['status']), 'value': log['value']} for log in logs}
+    logs_map = {log_date: (int(status), value) for log_date, status, value in logs}
 
     # Generate all dates in the range
-    labels = []
-    data = []
-    current_date = start_date
-
-    values = []
-    while current_date <= end_date:
-        date_str = current_date.strftime('%Y-%m-%d')
-        labels.append(date_str)
-        log_entry = logs_map.get(date_str, {'status': 0, 'value': None})
-        data.append(log_entry['status'])
-        values.append(log_entry['value'])
-        current_date += timedelta(days=1)
+    labels = [(start_date + timedelta(days=offset)).isoformat() for offset in range(days)]
+    entries = [logs_map.get(date_str, (0, None)) for date_str in labels]
+    data = [status for status, value in entries]
+    values = [value for status, value in entries]
 
     return {
         'labels': labels,
@@ -328,18 +372,25 @@ def get_yearly_heatmap_data(year=None):
 
     # SECURITY: Get ALL public habits (including deleted) that existed during this year
     # We need to include deleted habits to get accurate historical data
+    # Each habit's effective start date is its first log date (handles backdated
+    # logs), falling back to the created_at date for habits with no logs yet
     habits_query = """
-        SELECT id, name, created_at
-        FROM habits
-        WHERE is_public = 1
-          AND created_at <= ?
-        ORDER BY created_at ASC
+        SELECT h.id,
+               COALESCE(
+                   (SELECT MIN(l.date) FROM logs l WHERE l.habit_id = h.id),
+                   DATE(h.created_at)
+               )
+        FROM habits h
+        WHERE h.is_public = 1
+          AND h.created_at <= ?
+        ORDER BY h.created_at ASC
     """
 
     # Get all public habits created on or before the end of the year
     all_habits = db.execute_query(
         habits_query,
-        (end_date.strftime('%Y-%m-%d 23:59:59'),)
+        (f'{end_date.isoformat()} 23:59:59',),
+        as_tuples=True
     )
 
     # If no public habits, return empty structure
@@ -357,53 +408,25 @@ def get_yearly_heatmap_data(year=None):
         }
 
     # Get all habit IDs for this year
-    habit_ids = [habit['id'] for habit in all_habits]
+    habit_ids = [habit_id for habit_id, start_date_str in all_habits]
 
-    # Get all completed logs for these habits in this year
+    # Count completed logs per date for these habits in this year
     placeholders = ','.join('?' * len(habit_ids))
     logs_query = f"""
-        SELECT l.habit_id, l.date
+        SELECT l.date, COUNT(*)
         FROM logs l
         WHERE l.habit_id IN ({placeholders})
           AND l.status = 1
           AND l.date >= ?
           AND l.date <= ?
+        GROUP BY l.date
     """
 
-    params = tuple(habit_ids) + (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
-    logs = db.execute_query(logs_query, params)
-
-    # Create a mapping of date -> set of completed habit_ids
-    completed_by_date = {}
-    for log in logs:
-        date_str = log['date']
-        if date_str not in completed_by_date:
-            completed_by_date[date_str] = set()
-        completed_by_date[date_str].add(log['habit_id'])
-
-    # Get the first log date for each habit (this is when the habit "started" for historical purposes)
-    # Use first log date instead of created_at to handle backdated logs correctly
-    first_log_query = f"""
-        SELECT habit_id, MIN(date) as first_log_date
-        FROM logs
-        WHERE habit_id IN ({placeholders})
-        GROUP BY habit_id
-    """
-    first_logs = db.execute_query(first_log_query, tuple(habit_ids))
-    first_log_map = {log['habit_id']: log['first_log_date'] for log in first_logs}
+    params = tuple(habit_ids) + (start_date.isoformat(), end_date.isoformat())
+    completed_by_date = dict(db.execute_query(logs_query, params, as_tuples=True))
 
-    # Create a mapping of habit_id -> effective start date
-    # Use first log date if available, otherwise fall back to created_at date
-    habit_created_dates = {}
-    for habit in all_habits:
-        habit_id = habit['id']
-        if habit_id in first_log_map:
-            # Use first log date
-            habit_created_dates[habit_id] = first_log_map[habit_id]
-        else:
-            # No logs yet, use created_at timestamp
-            created_str = habit['created_at'].split(' ')[0]  # Get just the date part
-            habit_created_dates[habit_id] = created_str
+    # Mapping of habit_id -> effective start date
+    habit_created_dates = dict(all_habits)
 
     # Build months structure
     months_data = []
@@ -412,8 +435,16 @@ def get_yearly_heatmap_data(year=None):
         'July', 'August', 'September', 'October', 'November', 'December'
     ]
 
-    # Track statistics
-    all_days_data = []
+    # Sorted start dates, so the habits existing on a date are counted with bisect
+    sorted_start_dates = sorted(habit_created_dates.values())
+
+    # Only past days count towards overall stats
+    today = datetime.now().date()
+
+    # Track statistics as days are built (best/worst keep the earliest day on ties)
+    tracked_percentages = []
+    best_day = None
+    worst_day = None
 
     for month_num in range(1, 13):
         # Get number of days in this month
@@ -425,27 +456,20 @@ def get_yearly_heatmap_data(year=None):
         days_data = []
 
         for day_num in range(1, num_days + 1):
-            date_obj = datetime(year, month_num, day_num).date()
-            date_str = date_obj.strftime('%Y-%m-%d')
+            date_obj = date_type(year, month_num, day_num)
+            date_str = date_obj.isoformat()
 
             # Count habits that existed on this date (created_at <= date)
-            habits_on_date = [
-                habit_id for habit_id, created_date in habit_created_dates.items()
-                if created_date <= date_str
-            ]
-            total_habits_on_date = len(habits_on_date)
+            total_habits_on_date = bisect_right(sorted_start_dates, date_str)
 
             # For dates where no habits existed yet or future dates, show 0% (gray box)
             if total_habits_on_date == 0:
                 completion_percentage = 0.0
                 completed_count = 0
             else:
-                # Count completions for habits that existed on this date
-                completed_on_date = completed_by_date.get(date_str, set())
-                completed_count = len([
-                    habit_id for habit_id in completed_on_date
-                    if habit_id in habits_on_date
-                ])
+                # A habit's start date is its first log date, so every habit
+                # completed on this date already existed on it
+                completed_count = completed_by_date.get(date_str, 0)
 
                 # Calculate percentage based on habits that existed on this date
                 completion_percentage = (completed_count / total_habits_on_date) * 100.0
@@ -462,9 +486,13 @@ def get_yearly_heatmap_data(year=None):
 
             # Only include in overall stats if habits existed AND the date has passed
             # (for accurate statistics - don't count future days)
-            today = datetime.now().date()
             if total_habits_on_date > 0 and date_obj <= today:
-                all_days_data.append(day_data)
+                percentage = day_data['completion_percentage']
+                tracked_percentages.append(percentage)
+                if best_day is None or percentage > best_day['completion_percentage']:
+                    best_day = day_data
+                if worst_day is None or percentage < worst_day['completion_percentage']:
+                    worst_day = day_data
 
         month_data = {
             'month': month_num,
@@ -476,14 +504,10 @@ def get_yearly_heatmap_data(year=None):
         months_data.append(month_data)
 
     # Calculate overall statistics
-    total_days_tracked = len(all_days_data)
+    total_days_tracked = len(tracked_percentages)
 
     if total_days_tracked > 0:
-        average_completion = sum(day['completion_percentage'] for day in all_days_data) / total_days_tracked
-
-        # Find best and worst days
-        best_day = max(all_days_data, key=lambda d: d['completion_percentage'])
-        worst_day = min(all_days_data, key=lambda d: d['completion_percentage'])
+        average_completion = sum(tracked_percentages) / total_days_tracked
 
         overall_stats = {
             'total_days_tracked': total_days_tracked,
@@ -513,38 +537,52 @@ def get_yearly_heatmap_data(year=None):
     }
 
 
-def get_cumulative_total(habit_id, days):
+def get_cumulative_totals(habit_ids, end_date):
     """
-    Calculate the cumulative total of values for a habit over a time period.
+    Calculate week, month, and year value totals for several habits at once.
+
+    Totals cover the last 7, 30, and 365 days up to end_date and are
+    computed in a single query.
 
     Args:
-        habit_id: The habit ID
-        days: Number of days to sum (7 for week, 30 for month, 365 for year)
+        habit_ids: List of habit IDs
+        end_date: Last date (inclusive) of every period
 
     Returns:
-        Float: Total sum of values, or 0 if no values recorded
+        Dictionary mapping habit_id to (week, month, year) float totals.
+        Habits without values are omitted.
     """
-    from datetime import datetime, timedelta
+    if not habit_ids:
+        return {}
 
     db = get_db()
-    end_date = datetime.now().date()
-    start_date = end_date - timedelta(days=days - 1)
+    placeholders = ','.join('?' * len(habit_ids))
 
-    query = """
-        SELECT COALESCE(SUM(value), 0) as total
+    query = f"""
+        SELECT habit_id,
+               COALESCE(SUM(CASE WHEN date >= ? THEN value END), 0),
+               COALESCE(SUM(CASE WHEN date >= ? THEN value END), 0),
+               COALESCE(SUM(value), 0)
         FROM logs
-        WHERE habit_id = ?
+        WHERE habit_id IN ({placeholders})
           AND date >= ?
           AND date <= ?
           AND value IS NOT NULL
+        GROUP BY habit_id
     """
 
-    result = db.execute_query(
-        query,
-        (habit_id, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+    params = (
+        (end_date - timedelta(days=6)).isoformat(),
+        (end_date - timedelta(days=29)).isoformat(),
+        *habit_ids,
+        (end_date - timedelta(days=364)).isoformat(),
+        end_date.isoformat()
     )
 
-    return float(result[0]['total']) if result else 0.0
+    return {
+        habit_id: (float(week), float(month), float(year))
+        for habit_id, week, month, year in db.execute_query(query, params, as_tuples=True)
+    }
 
 
 def get_archived_habits_data():
@@ -589,61 +627,60 @@ def get_archived_habits_data():
     if not archived_habits:
         return []
 
+    habit_ids = [habit['id'] for habit in archived_habits]
+    placeholders = ','.join('?' * len(habit_ids))
+
+    # Lifetime totals and date range for all archived habits at once
+    stats_query = f"""
+        SELECT habit_id, COUNT(*), SUM(status), MIN(date), MAX(date)
+        FROM logs
+        WHERE habit_id IN ({placeholders})
+        GROUP BY habit_id
+    """
+    stats_by_habit = {
+        row[0]: row[1:]
+        for row in db.execute_query(stats_query, tuple(habit_ids), as_tuples=True)
+    }
+
+    # Completed dates in order, for the longest run of consecutive days
+    completed_query = f"""
+        SELECT habit_id, date
+        FROM logs
+        WHERE habit_id IN ({placeholders})
+          AND status = 1
+        ORDER BY habit_id, date ASC
+    """
+    completed_dates_by_habit = {habit_id: [] for habit_id in habit_ids}
+    for habit_id, date_str in db.execute_query(completed_query, tuple(habit_ids), as_tuples=True):
+        completed_dates_by_habit[habit_id].append(date_str)
+
     archived_data = []
 
     for habit in archived_habits:
         habit_id = habit['id']
 
-        # Get all logs for this habit
-        logs_query = """
-            SELECT date, status
-            FROM logs
-            WHERE habit_id = ?
-            ORDER BY date ASC
-        """
-        logs = db.execute_query(logs_query, (habit_id,))
-
-        if not logs:
+        if habit_id not in stats_by_habit:
             # Habit has no logs, skip it
             continue
 
         # Calculate statistics
-        total_logs = len(logs)
-        completed_logs = [log for log in logs if log['status']]
-        total_completions = len(completed_logs)
+        total_logs, total_completions, first_log, last_log = stats_by_habit[habit_id]
         completion_rate = (total_completions / total_logs * 100.0) if total_logs > 0 else 0.0
 
-        # Get date range
-        first_log = logs[0]['date']
-        last_log = logs[-1]['date']
-
         # Calculate longest streak
         longest_streak = 0
         current_streak = 0
-        prev_date = None
-
-        for log in logs:
-            if log['status']:
-                # Completed
-                if prev_date is None:
-                    current_streak = 1
-                else:
-                    # Check if consecutive days
-                    log_date = datetime.strptime(log['date'], '%Y-%m-%d').date()
-                    prev_date_obj = datetime.strptime(prev_date, '%Y-%m-%d').date()
-                    days_diff = (log_date - prev_date_obj).days
-
-                    if days_diff == 1:
-                        current_streak += 1
-                    else:
-                        current_streak = 1
-
-                longest_streak = max(longest_streak, current_streak)
-                prev_date = log['date']
+        prev_ordinal = None
+
+        for date_str in completed_dates_by_habit[habit_id]:
+            ordinal = date_type.fromisoformat(date_str).toordinal()
+            if ordinal - 1 == prev_ordinal:
+                current_streak += 1
             else:
-                # Not completed, reset streak
-                current_streak = 0
-                prev_date = log['date']
+                current_streak = 1
+
+            longest_streak = max(longest_streak, current_streak)
+            prev_ordinal = ordinal
 
         habit_data = {
             'id': habit_id,
@@ -2,35 +2,57 @@
 
 from models import get_db
 
-
-def get_all_habits(include_private=False):
+# Column order of every habits SELECT in this module
+HABIT_COLUMNS = (
+    'id', 'name', 'is_active', 'is_public', 'order_index', 'tracks_value',
+    'value_unit', 'value_aggregation_type', 'categories', 'created_at'
+)
+
+# Shared SELECT for habit rows, built from HABIT_COLUMNS so the two can't drift
+HABIT_SELECT = "SELECT " + ", ".join(HABIT_COLUMNS) + " FROM habits "
+
+# Habit list queries keyed by include_private. Kept as separate statements
+# (not one "? OR is_public = 1" query) so the planner can use
+# idx_habits_public_active_order for the public filter.
+ALL_HABITS_QUERIES = {
+    True: HABIT_SELECT + "ORDER BY order_index ASC, created_at ASC",
+    False: HABIT_SELECT + "WHERE is_public = 1 ORDER BY order_index ASC, created_at ASC",
+}
+ACTIVE_HABITS_QUERIES = {
+    True: HABIT_SELECT + "WHERE is_active = 1 ORDER BY order_index ASC, created_at ASC",
+    False: HABIT_SELECT + "WHERE is_active = 1 AND is_public = 1 ORDER BY order_index ASC, created_at ASC",
+}
+
+# Columns update_habit may set, with their SET clause
+UPDATE_FIELDS = {
+    'name': 'name = ?',
+    'is_active': 'is_active = ?',
+    'is_public': 'is_public = ?',
+    'order_index': 'order_index = ?',
+    'tracks_value': 'tracks_value = ?',
+    'value_unit': 'value_unit = ?',
+    'value_aggregation_type': 'value_aggregation_type = ?',
+    'categories': 'categories = ?'
+}
+
+# Boolean columns, stored as 0/1 in SQLite
+BOOLEAN_FIELDS = frozenset({'is_active', 'is_public', 'tracks_value'})
+
+
+def get_all_habits(include_private=False, as_tuples=False):
     """
     Get all habits ordered by order_index.
 
     Args:
         include_private: If False, only returns habits where is_public=True.
                         Defaults to False for security.
+        as_tuples: If True, rows are plain tuples in HABIT_COLUMNS order
 
     Returns:
         List of habit rows
     """
     db = get_db()
-
-    if include_private:
-        query = """
-            SELECT id, name, is_active, is_public, order_index, tracks_value, value_unit, value_aggregation_type, categories, created_at
-            FROM habits
-            ORDER BY order_index ASC, created_at ASC
-        """
-        return db.execute_query(query)
-    else:
-        query = """
-            SELECT id, name, is_active, is_public, order_index, tracks_value, value_unit, value_aggregation_type, categories, created_at
-            FROM habits
-            WHERE is_public = 1
-            ORDER BY order_index ASC, created_at ASC
-        """
-        return db.execute_query(query)
+    return db.execute_query(ALL_HABITS_QUERIES[bool(include_private)], as_tuples=as_tuples)
 
 
 def get_active_habits(include_private=True):
@@ -45,23 +67,7 @@ def get_active_habits(include_private=True):
         List of active habit rows
     """
     db = get_db()
-
-    if include_private:
-        query = """
-            SELECT id, name, is_active, is_public, order_index, tracks_value, value_unit, value_aggregation_type, categories, created_at
-            FROM habits
-            WHERE is_active = 1
-            ORDER BY order_index ASC, created_at ASC
-        """
-        return db.execute_query(query)
-    else:
-        query = """
-            SELECT id, name, is_active, is_public, order_index, tracks_value, value_unit, value_aggregation_type, categories, created_at
-            FROM habits
-            WHERE is_active = 1 AND is_public = 1
-            ORDER BY order_index ASC, created_at ASC
-        """
-        return db.execute_query(query)
+    return db.execute_query(ACTIVE_HABITS_QUERIES[bool(include_private)])
 
 
 def get_habit_by_id(habit_id):
@@ -75,12 +81,7 @@ def get_habit_by_id(habit_id):
         Habit row or None if not found
     """
     db = get_db()
-    query = """
-        SELECT id, name, is_active, is_public, order_index, tracks_value, value_unit, value_aggregation_type, categories, created_at
-        FROM habits
-        WHERE id = ?
-    """
-    results = db.execute_query(query, (habit_id,))
+    results = db.execute_query(HABIT_SELECT + "WHERE id = ?", (habit_id,))
     return results[0] if results else None
 
 
@@ -101,20 +102,16 @@ def create_habit(name, is_public=True, tracks_value=False, value_unit=None, valu
     """
     db = get_db()
 
-    # Get the max order_index to append new habit at the end
-    max_order_query = "SELECT MAX(order_index) as max_order FROM habits"
-    result = db.execute_query(max_order_query)
-    max_order = result[0]['max_order'] if result and result[0]['max_order'] is not None else -1
-    next_order = max_order + 1
-
+    # Append the new habit at the end, computing the next order_index in the
+    # same statement (one round trip, no race between read and insert)
     query = """
         INSERT INTO habits (name, is_public, is_active, order_index, tracks_value, value_unit, value_aggregation_type, categories)
-        VALUES (?, ?, 1, ?, ?, ?, ?, ?)
+        SELECT ?, ?, 1, COALESCE(MAX(order_index), -1) + 1, ?, ?, ?, ?
+        FROM habits
     """
-    return db.execute_update(query, (
+    return db.execute_insert(query, (
         name,
         1 if is_public else 0,
-        next_order,
         1 if tracks_value else 0,
         value_unit,
         value_aggregation_type,
@@ -137,25 +134,14 @@ def update_habit(habit_id, **kwargs):
 
     # Build dynamic UPDATE query based on provided kwargs
     # Using a whitelist approach for security
-    allowed_fields = {
-        'name': 'name = ?',
-        'is_active': 'is_active = ?',
-        'is_public': 'is_public = ?',
-        'order_index': 'order_index = ?',
-        'tracks_value': 'tracks_value = ?',
-        'value_unit': 'value_unit = ?',
-        'value_aggregation_type': 'value_aggregation_type = ?',
-        'categories': 'categories = ?'
-    }
-
     updates = []
     values = []
 
     for field, value in kwargs.items():
-        if field in allowed_fields:
-            updates.append(allowed_fields[field])
+        if field in UPDATE_FIELDS:
+            updates.append(UPDATE_FIELDS[field])
             # Convert boolean to int for SQLite
-            if field in ['is_active', 'is_public', 'tracks_value'] and isinstance(value, bool):
+            if field in BOOLEAN_FIELDS and isinstance(value, bool):
                 values.append(1 if value else 0)
             else:
                 values.append(value)
@@ -181,18 +167,12 @@ def reorder_habits(habit_ids):
         Number of habits updated
     """
     db = get_db()
-    updated_count = 0
-
-    with db.get_connection() as conn:
-        cursor = conn.cursor()
-        for index, habit_id in enumerate(habit_ids):
-            cursor.execute(
-                "UPDATE habits SET order_index = ? WHERE id = ?",
-                (index, habit_id)
-            )
-            updated_count += cursor.rowcount
-
-    return updated_count
+
+    # One executemany in one transaction (rowcount is summed across rows)
+    return db.execute_many(
+        "UPDATE habits SET order_index = ? WHERE id = ?",
+        list(enumerate(habit_ids))
+    )
 
 
 def delete_habit(habit_id):
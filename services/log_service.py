@@ -3,13 +3,21 @@
 from datetime import datetime, timedelta
 from models import get_db
 
+# Insert a log, or update the existing log for the same habit and date
+UPSERT_LOG_QUERY = """
+    INSERT INTO logs (habit_id, date, status, value, category)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(habit_id, date)
+    DO UPDATE SET status = excluded.status, value = excluded.value, category = excluded.category
+"""
+
 
 def get_logs_for_date(date, include_private=True):
     """
     Get all logs for a specific date.
 
     Args:
-        date: Date string in 'YYYY-MM-DD' format or datetime object
+        date: Date string in 'YYYY-MM-DD' format
         include_private: If True, includes logs for private habits
 
     Returns:
@@ -17,10 +25,6 @@ def get_logs_for_date(date, include_private=True):
     """
     db = get_db()
 
-    # Convert datetime to string if needed
-    if isinstance(date, datetime):
-        date = date.strftime('%Y-%m-%d')
-
     if include_private:
         query = """
             SELECT l.id, l.habit_id, l.date, l.status, l.value, l.category,
@@ -49,20 +53,14 @@ def get_logs_for_habit(habit_id, start_date=None, end_date=None):
 
     Args:
         habit_id: The habit ID
-        start_date: Optional start date (YYYY-MM-DD or datetime)
-        end_date: Optional end date (YYYY-MM-DD or datetime)
+        start_date: Optional start date string (YYYY-MM-DD)
+        end_date: Optional end date string (YYYY-MM-DD)
 
     Returns:
         List of log rows ordered by date descending
     """
     db = get_db()
 
-    # Convert datetime to string if needed
-    if isinstance(start_date, datetime):
-        start_date = start_date.strftime('%Y-%m-%d')
-    if isinstance(end_date, datetime):
-        end_date = end_date.strftime('%Y-%m-%d')
-
     if start_date and end_date:
         query = """
             SELECT id, habit_id, date, status, value, category
@@ -103,32 +101,20 @@ def upsert_log(habit_id, date, status, value=None, category=None):
 
     Args:
         habit_id: The habit ID
-        date: Date string in 'YYYY-MM-DD' format or datetime object
+        date: Date string in 'YYYY-MM-DD' format
         status: Boolean indicating completion (True) or not (False)
         value: Optional numeric value (e.g., pushup count, weight)
         category: Optional category string (e.g., "Cardio", "Strength")
 
     Returns:
-        ID of inserted/updated log
+        Number of rows affected
     """
     db = get_db()
 
-    # Convert datetime to string if needed
-    if isinstance(date, datetime):
-        date = date.strftime('%Y-%m-%d')
-
     # Convert boolean to int for SQLite
     status_int = 1 if status else 0
 
-    # Use INSERT OR REPLACE (upsert)
-    query = """
-        INSERT INTO logs (habit_id, date, status, value, category)
-        VALUES (?, ?, ?, ?, ?)
-        ON CONFLICT(habit_id, date)
-        DO UPDATE SET status = excluded.status, value = excluded.value, category = excluded.category
-    """
-
-    return db.execute_update(query, (habit_id, date, status_int, value, category))
+    return db.execute_update(UPSERT_LOG_QUERY, (habit_id, date, status_int, value, category))
 
 
 def delete_log(habit_id, date):
@@ -137,17 +123,13 @@ def delete_log(habit_id, date):
 
     Args:
         habit_id: The habit ID
-        date: Date string in 'YYYY-MM-DD' format or datetime object
+        date: Date string in 'YYYY-MM-DD' format
 
     Returns:
         Number of rows affected
     """
     db = get_db()
 
-    # Convert datetime to string if needed
-    if isinstance(date, datetime):
-        date = date.strftime('%Y-%m-%d')
-
     query = "DELETE FROM logs WHERE habit_id = ? AND date = ?"
     return db.execute_update(query, (habit_id, date))
 
@@ -166,57 +148,71 @@ def get_habit_streak(habit_id):
             'last_completed_date': str or None
         }
     """
-    db = get_db()
+    return get_current_streaks([habit_id], datetime.now().date())[habit_id]
 
-    # Get all completed logs for this habit, ordered by date descending
-    query = """
-        SELECT date, status, value, category
-        FROM logs
-        WHERE habit_id = ? AND status = 1
-        ORDER BY date DESC
+
+def get_current_streaks(habit_ids, today):
     """
-    logs = db.execute_query(query, (habit_id,))
-
-    if not logs:
-        return {'current_streak': 0, 'last_completed_date': None}
-
-    # Check if the most recent log is today or yesterday
-    today = datetime.now().date()
-    streak = 0
-    last_completed_date = None
-
-    for log in logs:
-        log_date = datetime.strptime(log['date'], '%Y-%m-%d').date()
-
-        if last_completed_date is None:
-            # First iteration - check if it's today or in the past
-            if log_date > today:
-                # Future date, skip it
-                continue
-
-            last_completed_date = log_date
-            expected_date = log_date
-
-            # Start counting streak
-            if log_date == today or log_date == today - timedelta(days=1):
-                streak = 1
-                expected_date = log_date - timedelta(days=1)
-            else:
-                # Gap between today and last completed date
-                break
-        else:
-            # Check if this log is consecutive
-            if log_date == expected_date:
-                streak += 1
-                expected_date = log_date - timedelta(days=1)
-            else:
-                # Gap found, streak is broken
-                break
+    Calculate the current streak for several habits in one query.
 
-    return {
-        'current_streak': streak,
-        'last_completed_date': last_completed_date.strftime('%Y-%m-%d') if last_completed_date else None
-    }
+    The latest run of consecutive completed days is walked in SQL, one
+    index seek per day of the streak, and only one row per habit is
+    returned (the full completion history is never read).
+
+    Args:
+        habit_ids: List of habit IDs
+        today: Date the streaks are counted up to (later logs are ignored)
+
+    Returns:
+        Dictionary mapping habit_id to streak information (see get_habit_streak)
+    """
+    streaks = {habit_id: {'current_streak': 0, 'last_completed_date': None} for habit_id in habit_ids}
+    if not habit_ids:
+        return streaks
+
+    db = get_db()
+    placeholders = ','.join('?' * len(habit_ids))
+
+    # Anchor: each habit's latest completed date up to today. Then step back
+    # one day at a time while the previous day was also completed (an index
+    # seek per step), only for runs that reach today or yesterday.
+    query = f"""
+        WITH RECURSIVE run(habit_id, date, length, is_current) AS (
+            SELECT habit_id, MAX(date), 1, MAX(date) >= ?
+            FROM logs
+            WHERE habit_id IN ({placeholders})
+              AND status = 1
+              AND date <= ?
+            GROUP BY habit_id
+
+            UNION ALL
+
+            SELECT run.habit_id, logs.date, run.length + 1, 1
+            FROM run
+            JOIN logs
+              ON logs.habit_id = run.habit_id
+             AND logs.status = 1
+             AND logs.date = date(run.date, '-1 day')
+            WHERE run.is_current
+        )
+        SELECT habit_id, MAX(date), MAX(length), MAX(is_current)
+        FROM run
+        GROUP BY habit_id
+    """
+
+    today_str = today.isoformat()
+    yesterday_str = (today - timedelta(days=1)).isoformat()
+
+    for habit_id, last_completed_date, run_length, is_current in db.execute_query(
+        query, (yesterday_str,) + tuple(habit_ids) + (today_str,), as_tuples=True
+    ):
+        # The streak only counts if the latest run reaches today or yesterday
+        streaks[habit_id] = {
+            'current_streak': run_length if is_current else 0,
+            'last_completed_date': last_completed_date
+        }
+
+    return streaks
 
 
 def save_day_logs(date, habit_statuses):
@@ -224,38 +220,66 @@ def save_day_logs(date, habit_statuses):
     Save multiple log entries for a single day.
 
     Args:
-        date: Date string in 'YYYY-MM-DD' format or datetime object
+        date: Date string in 'YYYY-MM-DD' format
         habit_statuses: Dictionary mapping habit_id to status boolean or dict with status, value, and category
                        Examples:
                        - Simple: {1: True, 2: False}
                        - With values: {1: {'status': True, 'value': 10}, 2: {'status': False}}
                        - With category: {1: {'status': True, 'category': 'Cardio'}}
 
+    Returns:
+        Number of logs saved
+    """
+    # Build UPSERT_LOG_QUERY parameters directly (date is already a string)
+    params = [
+        # Support both simple boolean and dict format
+        (habit_id, date, 1 if status_data.get('status') else 0,
+         status_data.get('value'), status_data.get('category'))
+        if isinstance(status_data, dict)
+        else (habit_id, date, 1 if status_data else 0, None, None)
+        for habit_id, status_data in habit_statuses.items()
+    ]
+
+    if not params:
+        return 0
+
+    # Upsert all logs in one transaction
+    get_db().execute_many(UPSERT_LOG_QUERY, params)
+
+    return len(params)
+
+
+def bulk_upsert_logs(rows):
+    """
+    Insert or update many log entries in a single transaction.
+
+    Args:
+        rows: Iterable of (habit_id, date, status) or
+              (habit_id, date, status, value, category) tuples.
+              Dates may be 'YYYY-MM-DD' strings or date/datetime objects.
+
     Returns:
         Number of logs saved
     """
     db = get_db()
 
-    # Convert datetime to string if needed
-    if isinstance(date, datetime):
-        date = date.strftime('%Y-%m-%d')
+    params = []
+    for habit_id, date, status, *extra in rows:
+        value, category = (list(extra) + [None, None])[:2]
 
-    count = 0
-    for habit_id, status_data in habit_statuses.items():
-        # Support both simple boolean and dict format
-        if isinstance(status_data, dict):
-            status = status_data.get('status', False)
-            value = status_data.get('value')
-            category = status_data.get('category')
-        else:
-            status = status_data
-            value = None
-            category = None
+        # Convert date/datetime to string if needed
+        if not isinstance(date, str):
+            date = date.strftime('%Y-%m-%d')
+
+        params.append((habit_id, date, 1 if status else 0, value, category))
+
+    if not params:
+        return 0
 
-        upsert_log(habit_id, date, status, value, category)
-        count += 1
+    # Upsert all logs in one transaction
+    db.execute_many(UPSERT_LOG_QUERY, params)
 
-    return count
+    return len(params)
 
 
 def get_value_stats(habit_id, days=30):
@@ -283,7 +307,7 @@ def get_value_stats(habit_id, days=30):
     start_date = end_date - timedelta(days=days - 1)
 
     query = """
-        SELECT value, date
+        SELECT value
         FROM logs
         WHERE habit_id = ?
           AND date >= ?
@@ -294,10 +318,24 @@ def get_value_stats(habit_id, days=30):
 
     results = db.execute_query(
         query,
-        (habit_id, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+        (habit_id, start_date.isoformat(), end_date.isoformat()),
+        as_tuples=True
     )
 
-    if not results:
+    return summarize_values([value for value, in results])
+
+
+def summarize_values(values):
+    """
+    Summarize a habit's logged values.
+
+    Args:
+        values: Non-null values, newest first
+
+    Returns:
+        Dictionary with value statistics (see get_value_stats)
+    """
+    if not values:
         return {
             'total': 0,
             'average': 0,
@@ -307,7 +345,6 @@ def get_value_stats(habit_id, days=30):
             'latest_value': None
         }
 
-    values = [row['value'] for row in results]
     count = len(values)
 
     return {
@@ -316,7 +353,7 @@ def get_value_stats(habit_id, days=30):
         'min': round(min(values), 2),
         'max': round(max(values), 2),
         'count': count,
-        'latest_value': round(results[0]['value'], 2) if results else None
+        'latest_value': round(values[0], 2)
     }
 
 
@@ -336,26 +373,58 @@ def get_completion_stats(habit_id, days=30):
             'completion_rate': float (0-100)
         }
     """
-    db = get_db()
+    return get_completion_stats_for_habits([habit_id], days)[habit_id]
 
-    end_date = datetime.now().date()
-    start_date = end_date - timedelta(days=days - 1)
 
-    query = """
-        SELECT COUNT(*) as completed_count
-        FROM logs
-        WHERE habit_id = ?
-          AND date >= ?
-          AND date <= ?
-          AND status = 1
+def get_completion_stats_for_habits(habit_ids, days=30):
     """
+    Get completion statistics for several habits over the last N days.
 
-    result = db.execute_query(
-        query,
-        (habit_id, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
-    )
+    Args:
+        habit_ids: List of habit IDs
+        days: Number of days to look back (default: 30)
+
+    Returns:
+        Dictionary mapping habit_id to completion statistics
+        (see get_completion_stats)
+    """
+    completed_by_habit = dict.fromkeys(habit_ids, 0)
+
+    if habit_ids:
+        db = get_db()
+        placeholders = ','.join('?' * len(habit_ids))
+
+        # The window is the last N local days, ending today
+        query = f"""
+            SELECT habit_id, COUNT(*)
+            FROM logs
+            WHERE habit_id IN ({placeholders})
+              AND date >= date('now', 'localtime', ?)
+              AND date <= date('now', 'localtime')
+              AND status = 1
+            GROUP BY habit_id
+        """
+
+        params = tuple(habit_ids) + (f'-{days - 1} days',)
+        completed_by_habit.update(db.execute_query(query, params, as_tuples=True))
 
-    completed_days = result[0]['completed_count'] if result else 0
+    return {
+        habit_id: summarize_completion(completed_days, days)
+        for habit_id, completed_days in completed_by_habit.items()
+    }
+
+
+def summarize_completion(completed_days, days):
+    """
+    Build completion statistics from a completed-day count.
+
+    Args:
+        completed_days: Number of completed days in the period
+        days: Length of the period in days
+
+    Returns:
+        Dictionary with completion statistics (see get_completion_stats)
+    """
     completion_rate = (completed_days / days) * 100 if days > 0 else 0
 
     return {
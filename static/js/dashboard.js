@@ -25,7 +25,7 @@ async function loadDashboard() {
             throw new Error('Failed to fetch dashboard data');
         }
 
-        const data = await response.json();
+        const data = expandKeys(await response.json());
 
         // Hide loading
         loadingEl.classList.add('hidden');
@@ -356,6 +356,47 @@ function formatShortDate(date) {
     return `${months[date.getMonth()]} ${date.getDate()}`;
 }
 
+/**
+ * Restore keys shortened by the server (payloads carry a "_k" legend)
+ * and rebuild lists the server sent column-wise
+ */
+function expandKeys(data) {
+    if (!data || !data._k) {
+        return data;
+    }
+
+    const legend = data._k;
+    const expand = (obj) => {
+        if (Array.isArray(obj)) {
+            return obj.map(expand);
+        }
+        if (obj && obj._col) {
+            // Columnar list: {_col: {key: [values...]}} back to a list of objects
+            const columns = Object.entries(obj._col);
+            const length = columns.length ? columns[0][1].length : 0;
+            return Array.from({ length }, (_, i) => {
+                const row = {};
+                for (const [key, values] of columns) {
+                    row[legend[key] || key] = expand(values[i]);
+                }
+                return row;
+            });
+        }
+        if (obj && typeof obj === 'object') {
+            const result = {};
+            for (const [key, value] of Object.entries(obj)) {
+                if (key !== '_k') {
+                    result[legend[key] || key] = expand(value);
+                }
+            }
+            return result;
+        }
+        return obj;
+    };
+
+    return expand(data);
+}
+
 /**
  * Escape HTML to prevent XSS
  */
@@ -431,7 +472,7 @@ async function loadHeatmap(year) {
             throw new Error('Failed to fetch heatmap data');
         }
 
-        const data = await response.json();
+        const data = expandKeys(await response.json());
 
         // Hide loading, show calendar
         heatmapLoading.classList.add('hidden');
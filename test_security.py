@@ -11,10 +11,11 @@ Tests various security aspects of the application including:
 - Authorization
 """
 
+import functools
 import os
+import re
 import sys
 import sqlite3
-from pathlib import Path
 
 # Colors for terminal output
 GREEN = '\033[92m'
@@ -22,37 +23,51 @@ RED = '\033[91m'
 YELLOW = '\033[93m'
 RESET = '\033[0m'
 
+# Result labels, formatted once
+PASS_LABEL = f"{GREEN}✓ PASS{RESET}"
+FAIL_LABEL = f"{RED}✗ FAIL{RESET}"
+
+# String formatting that builds SQL from values (should be parameterized)
+DANGEROUS_SQL_PATTERNS = [
+    'f"SELECT',
+    'f"INSERT',
+    'f"UPDATE',
+    'f"DELETE',
+    '% "SELECT',
+    '% "INSERT',
+    '% "UPDATE',
+    '% "DELETE',
+    '.format("SELECT',
+    '.format("INSERT',
+]
+
+# All patterns in one alternation, so each file is scanned once
+DANGEROUS_SQL_RE = re.compile('|'.join(map(re.escape, DANGEROUS_SQL_PATTERNS)))
+
+@functools.lru_cache(maxsize=None)
+def read_source(path):
+    """Read a source file once; several checks scan the same files"""
+    with open(path, 'r') as f:
+        return f.read()
+
 def print_test(name, passed, details=""):
     """Print test result with color coding"""
-    status = f"{GREEN}✓ PASS{RESET}" if passed else f"{RED}✗ FAIL{RESET}"
-    print(f"{status} - {name}")
+    status = PASS_LABEL if passed else FAIL_LABEL
+    # One write per result (status line, optional details, blank line)
     if details:
-        print(f"  {details}")
-    print()
+        print(f"{status} - {name}\n  {details}\n")
+    else:
+        print(f"{status} - {name}\n")
 
 def test_sql_injection_protection():
     """Test that SQL injection is prevented through parameterized queries"""
     print(f"{YELLOW}Testing SQL Injection Protection...{RESET}\n")
 
     # Check database.py for parameterized queries
-    with open('models/database.py', 'r') as f:
-        db_code = f.read()
+    db_code = read_source('models/database.py')
 
     # Look for dangerous string formatting in SQL
-    dangerous_patterns = [
-        'f"SELECT',
-        'f"INSERT',
-        'f"UPDATE',
-        'f"DELETE',
-        '% "SELECT',
-        '% "INSERT',
-        '% "UPDATE',
-        '% "DELETE',
-        '.format("SELECT',
-        '.format("INSERT',
-    ]
-
-    has_dangerous_sql = any(pattern in db_code for pattern in dangerous_patterns)
+    has_dangerous_sql = bool(DANGEROUS_SQL_RE.search(db_code))
     print_test(
         "Parameterized queries in database.py",
         not has_dangerous_sql,
@@ -68,9 +83,8 @@ def test_sql_injection_protection():
 
     all_safe = True
     for service_file in service_files:
-        with open(service_file, 'r') as f:
-            code = f.read()
-        has_dangerous = any(pattern in code for pattern in dangerous_patterns)
+        code = read_source(service_file)
+        has_dangerous = bool(DANGEROUS_SQL_RE.search(code))
         if has_dangerous:
             all_safe = False
             print_test(f"SQL injection check in {service_file}", False, "Found potential SQL injection vulnerability")
@@ -92,8 +106,7 @@ def test_xss_protection():
 
     all_safe = True
     for js_file in js_files:
-        with open(js_file, 'r') as f:
-            code = f.read()
+        code = read_source(js_file)
 
         # Check for escapeHtml function or textContent usage
         has_escape_function = 'escapeHtml' in code or 'textContent' in code
@@ -114,8 +127,7 @@ def test_authentication():
     print(f"{YELLOW}Testing Authentication...{RESET}\n")
 
     # Check for secrets.compare_digest usage
-    with open('routes/auth.py', 'r') as f:
-        auth_code = f.read()
+    auth_code = read_source('routes/auth.py')
 
     uses_constant_time = 'secrets.compare_digest' in auth_code
     print_test(
@@ -140,8 +152,7 @@ def test_session_security():
     """Test session security configuration"""
     print(f"{YELLOW}Testing Session Security...{RESET}\n")
 
-    with open('config.py', 'r') as f:
-        config_code = f.read()
+    config_code = read_source('config.py')
 
     # Check for session security settings
     checks = {
@@ -160,8 +171,7 @@ def test_authorization():
     """Test authorization on protected routes"""
     print(f"{YELLOW}Testing Authorization...{RESET}\n")
 
-    with open('routes/admin.py', 'r') as f:
-        admin_code = f.read()
+    admin_code = read_source('routes/admin.py')
 
     # Count @login_required decorators
     login_required_count = admin_code.count('@login_required')
@@ -176,8 +186,7 @@ def test_authorization():
     )
 
     # Check decorator implementation
-    with open('utils/decorators.py', 'r') as f:
-        decorator_code = f.read()
+    decorator_code = read_source('utils/decorators.py')
 
     checks_authenticated = "'authenticated' in session" in decorator_code or "session.get('authenticated')" in decorator_code
 
@@ -194,8 +203,7 @@ def test_input_validation():
     print(f"{YELLOW}Testing Input Validation...{RESET}\n")
 
     # Check routes for validation
-    with open('routes/admin.py', 'r') as f:
-        admin_code = f.read()
+    admin_code = read_source('routes/admin.py')
 
     # Check for JSON validation
     has_json_validation = 'request.get_json()' in admin_code
@@ -208,8 +216,7 @@ def test_input_validation():
     )
 
     # Check for maxlength in forms
-    with open('templates/admin/settings.html', 'r') as f:
-        template_code = f.read()
+    template_code = read_source('templates/admin/settings.html')
 
     has_maxlength = 'maxlength' in template_code
 
@@ -225,8 +232,7 @@ def test_public_private_separation():
     """Test that public/private habit separation is enforced"""
     print(f"{YELLOW}Testing Public/Private Habit Separation...{RESET}\n")
 
-    with open('services/dashboard_service.py', 'r') as f:
-        dashboard_code = f.read()
+    dashboard_code = read_source('services/dashboard_service.py')
 
     # Check that public dashboard only gets public habits
     # This can be done by filtering directly or via include_private=False
@@ -257,8 +263,11 @@ def test_environment_variables():
     """Test environment variable security"""
     print(f"{YELLOW}Testing Environment Variable Security...{RESET}\n")
 
+    # One directory listing for all the file checks below
+    root_names = {entry.name for entry in os.scandir('.')}
+
     # Check that .env exists
-    env_exists = Path('.env').exists()
+    env_exists = '.env' in root_names
     print_test(
         ".env file exists",
         env_exists,
@@ -266,10 +275,9 @@ def test_environment_variables():
     )
 
     # Check that .env is in .gitignore
-    gitignore_exists = Path('.gitignore').exists()
+    gitignore_exists = '.gitignore' in root_names
     if gitignore_exists:
-        with open('.gitignore', 'r') as f:
-            gitignore = f.read()
+        gitignore = read_source('.gitignore')
         env_ignored = '.env' in gitignore
         print_test(
             ".env is in .gitignore",
@@ -281,7 +289,7 @@ def test_environment_variables():
         env_ignored = False
 
     # Check .env.example exists
-    env_example_exists = Path('.env.example').exists()
+    env_example_exists = '.env.example' in root_names
     print_test(
         ".env.example exists",
         env_example_exists,
@@ -294,8 +302,7 @@ def test_error_handling():
     """Test error handling doesn't expose sensitive information"""
     print(f"{YELLOW}Testing Error Handling...{RESET}\n")
 
-    with open('app.py', 'r') as f:
-        app_code = f.read()
+    app_code = read_source('app.py')
 
     # In production, debug should be off
     # Check that debug is configurable
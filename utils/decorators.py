@@ -3,6 +3,26 @@
 from functools import wraps
 from flask import session, redirect, url_for, request, jsonify
 
+# Requests under this prefix get a JSON 401 instead of a login redirect
+API_PREFIX = '/api/'
+
+
+def unauthenticated_response():
+    """
+    Build the response for an unauthenticated request.
+
+    Returns:
+        401 JSON response for API/JSON requests, otherwise a redirect to login
+    """
+    if request.path.startswith(API_PREFIX) or request.is_json:
+        return jsonify({
+            'error': 'Authentication required',
+            'message': 'You must be logged in to access this resource'
+        }), 401
+
+    # For regular requests, redirect to login
+    return redirect(url_for('auth.login', next=request.url))
+
 
 def login_required(f):
     """
@@ -20,19 +40,10 @@ def login_required(f):
     """
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        # Check if user is authenticated
-        if not session.get('authenticated'):
-            # Check if this is an API request (JSON)
-            if request.is_json or request.path.startswith('/api/'):
-                return jsonify({
-                    'error': 'Authentication required',
-                    'message': 'You must be logged in to access this resource'
-                }), 401
-
-            # For regular requests, redirect to login
-            return redirect(url_for('auth.login', next=request.url))
-
-        return f(*args, **kwargs)
+        # Authenticated requests (the common case) go straight through
+        if session.get('authenticated'):
+            return f(*args, **kwargs)
+        return unauthenticated_response()
 
     return decorated_function
 
@@ -0,0 +1,44 @@
+"""Flask JSON provider backed by orjson, when it is installed."""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider that serializes with orjson instead of the stdlib json module.
+
+    Output matches Flask's default provider (sorted keys, indented in debug
+    mode), except that dates serialize as ISO 8601 strings. Calls with
+    extra json.dumps/json.loads keyword arguments fall back to the default
+    provider.
+    """
+
+    def dumps(self, obj, **kwargs):
+        """Serialize data as a JSON string."""
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_SORT_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        """Deserialize data from a JSON string or bytes."""
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """Serialize the arguments straight to response bytes."""
+        obj = self._prepare_response_obj(args, kwargs)
+
+        option = orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=option),
+            mimetype=self.mimetype
+        )
@@ -0,0 +1,63 @@
+"""Opt-in sampling profiler for Flask requests."""
+
+import cProfile
+import os
+import random
+import time
+from flask import g, request
+
+# Oldest profiles are deleted once the directory holds more than this
+MAX_PROFILES = 200
+
+
+def init_profiling(app, sample_rate, profile_dir):
+    """
+    Profile roughly 1 in sample_rate requests and dump them as .prof files.
+
+    Each dump is named after the request method, path, and time, and can be
+    read with pstats or snakeviz. Requests that arrive while another
+    profile is running are not sampled (only one profiler can be active).
+
+    Args:
+        app: Flask application
+        sample_rate: Profile 1 in this many requests (1 profiles every request)
+        profile_dir: Directory the .prof files are written to
+    """
+    os.makedirs(profile_dir, exist_ok=True)
+
+    @app.before_request
+    def start_profile():
+        if random.randrange(sample_rate):
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return  # Another request is already being profiled
+        g.profiler = profiler
+
+    @app.teardown_request
+    def dump_profile(exc):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return
+        profiler.disable()
+
+        name = request.path.strip('/').replace('/', '.') or 'root'
+        filename = f'{request.method}.{name}.{time.time() * 1000:.0f}.prof'
+        profiler.dump_stats(os.path.join(profile_dir, filename))
+        _prune_profiles(profile_dir)
+
+
+def _prune_profiles(profile_dir):
+    """Delete the oldest profiles beyond MAX_PROFILES."""
+    paths = [os.path.join(profile_dir, f) for f in os.listdir(profile_dir) if f.endswith('.prof')]
+    if len(paths) <= MAX_PROFILES:
+        return
+
+    paths.sort(key=os.path.getmtime)
+    for path in paths[:-MAX_PROFILES]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,53 @@
+"""Server-Timing response headers for per-request time breakdowns."""
+
+import time
+from contextlib import contextmanager
+from flask import g, has_request_context
+
+
+@contextmanager
+def timed(label):
+    """
+    Time a block and report it in the current response's Server-Timing header.
+
+    Blocks timed under the same label in one request are summed.
+
+    Outside a request (e.g. the background cache warmer) the block runs
+    untimed.
+
+    Args:
+        label: Metric name shown in browser dev tools (e.g. 'db')
+
+    Usage:
+        with timed('db'):
+            data = get_public_dashboard_data()
+    """
+    if not has_request_context():
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        # Repeated labels add up to one metric
+        timings = g.setdefault('server_timings', {})
+        timings[label] = timings.get(label, 0) + duration_ms
+
+
+def init_server_timing(app):
+    """
+    Add a Server-Timing header to responses that recorded timings.
+
+    Args:
+        app: Flask application
+    """
+    @app.after_request
+    def add_server_timing(response):
+        timings = g.get('server_timings')
+        if timings:
+            response.headers['Server-Timing'] = ', '.join(
+                f'{label};dur={duration:.1f}' for label, duration in timings.items()
+            )
+        return response
@@ -0,0 +1,33 @@
+"""Pre-rendered HTML for templates that don't depend on request data."""
+
+from flask import current_app, render_template, request, session
+
+# Rendered HTML keyed by (template name, script root, authenticated)
+_rendered_pages = {}
+
+
+def render_static_template(template_name):
+    """
+    Render a template once and reuse the HTML for later requests.
+
+    Only for templates rendered without context variables. The output of
+    base.html still varies with login state, so that is part of the cache
+    key. Requests with pending flash messages, and apps with template
+    auto-reload (debug mode), always render normally.
+
+    Args:
+        template_name: Template path, e.g. 'admin/login.html'
+
+    Returns:
+        Rendered HTML string
+    """
+    if '_flashes' in session or current_app.jinja_env.auto_reload:
+        return render_template(template_name)
+
+    key = (template_name, request.script_root, bool(session.get('authenticated')))
+    html = _rendered_pages.get(key)
+    if html is None:
+        html = render_template(template_name)
+        _rendered_pages[key] = html
+
+    return html